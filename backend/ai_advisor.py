@@ -1,41 +1,148 @@
+import json
+import os
+import time
 import boto3
+from pitch_cache import PitchCache, default_store, pitch_key, template_hash
+
+MODEL_ID = 'global.amazon.nova-2-lite-v1:0'
+INFERENCE_CONFIG = {"maxTokens": 1000, "temperature": 0.7}
+REASONING_CONFIG = {"reasoningConfig": {"type": "enabled", "maxReasoningEffort": "low"}}
+
+PROMPT_TEMPLATE = """
+    Act as a car sales expert. Write a persuasive 2-3 sentence pitch for a {year} {make} {model}.
+    The buyer's top priority is: {priority}.
+    Key specs: {city_mpg} MPG, {acceleration}s 0-60, {cargo_space} cu ft cargo.
+    Review Insights: {review_summary}
+    Notable Features: {features}
+    
+    Explain why this car fits their priority. Be sure to highlight the 'Pros' from the review insights and explicitly list out some of the best vehicle features.
+    """
+
+# part of every cache key, so a prompt or model change never serves pitches written for the old one
+PROMPT_HASH = template_hash(PROMPT_TEMPLATE, MODEL_ID, INFERENCE_CONFIG, REASONING_CONFIG)
+
+# one client per container instead of one per pitch
+_client = None
+_cache = None
+
+def bedrock_client():
+    global _client
+    if _client is None:
+        _client = boto3.client('bedrock-runtime', region_name='us-east-1')
+    return _client
+
+def pitch_cache():
+    """Process-wide PitchCache (PITCH_CACHE_SIZE / PITCH_CACHE_TTL, store from PITCH_CACHE_TABLE or PITCH_CACHE_DB)."""
+    global _cache
+    if _cache is None:
+        _cache = PitchCache(
+            max_entries=int(os.environ.get('PITCH_CACHE_SIZE', 256)),
+            ttl=int(os.environ.get('PITCH_CACHE_TTL', 7 * 24 * 3600)),
+            store=default_store()
+        )
+    return _cache
+
+def car_id(car_row):
+    year = car_row.get('year')
+    try:
+        year = int(year)
+    except (TypeError, ValueError):
+        pass
+    return (str(car_row.get('make')), str(car_row.get('model')), str(year))
+
+def _cached_pitch(car_row, priority):
+    """(cache key, cached pitch or None), logging the lookup."""
+    cache = pitch_cache()
+    key = pitch_key(car_id(car_row), priority, PROMPT_HASH)
+    start = time.perf_counter()
+    cached = cache.get(key)
+    print(json.dumps({'event': 'pitch_cache', 'hit': cached is not None, 'lookup_ms': round((time.perf_counter() - start) * 1000, 2), **cache.stats()}))
+    return key, cached
+
+def fallback_pitch(car_row, priority):
+    return f"This {car_row.get('model')} is a fantastic choice for {priority}."
 
 def get_car_pitch(car_row, priority):
     """
     Uses AWS Bedrock to generate a sales pitch.
+    Pitches are cached per car, priority and prompt version (see PitchCache).
     """
-    
-    prompt = f"""
-    Act as a car sales expert. Write a persuasive 2-3 sentence pitch for a {car_row.get('year')} {car_row.get('make')} {car_row.get('model')}.
-    The buyer's top priority is: {priority}.
-    Key specs: {car_row.get('city_mpg')} MPG, {car_row.get('acceleration')}s 0-60, {car_row.get('cargo_space')} cu ft cargo.
-    Review Insights: {car_row.get('review_summary')}
-    Notable Features: {car_row.get('features')}
-    
-    Explain why this car fits their priority. Be sure to highlight the 'Pros' from the review insights and explicitly list out some of the best vehicle features.
+    key, cached = _cached_pitch(car_row, priority)
+    if cached is not None:
+        return cached
+
+    pitch = generate_pitch(car_row, priority)
+    if pitch is not None:
+        pitch_cache().put(key, pitch)
+        return pitch
+    return fallback_pitch(car_row, priority)
+
+def stream_car_pitch(car_row, priority):
     """
-    
+    Streaming get_car_pitch: yields text deltas from converse_stream as they arrive, skipping reasoning deltas.
+    A cached pitch comes back as one chunk; the finished stream is cached like a converse pitch.
+    """
+    key, cached = _cached_pitch(car_row, priority)
+    if cached is not None:
+        yield cached
+        return
+
+    parts = []
+    text_block = None
     try:
-        client = boto3.client('bedrock-runtime', region_name='us-east-1')
-        
-        response = client.converse(
-            modelId='global.amazon.nova-2-lite-v1:0', 
-            messages=[
-                {
-                    "role": "user",
-                    "content": [{"text": prompt}]
-                }
-            ],
-            inferenceConfig={
-                "maxTokens": 1000, 
-                "temperature": 0.7
-            },
-            additionalModelRequestFields={
-                "reasoningConfig": {
-                    "type": "enabled", 
-                    "maxReasoningEffort": "low" 
-                }
-            }
+        response = bedrock_client().converse_stream(
+            modelId=MODEL_ID,
+            messages=build_messages(car_row, priority),
+            inferenceConfig=INFERENCE_CONFIG,
+            additionalModelRequestFields=REASONING_CONFIG
+        )
+        for event in response["stream"]:
+            block = event.get("contentBlockDelta")
+            if not block or "text" not in block["delta"]:
+                # reasoningContent deltas, block start/stop and metadata
+                continue
+            text = block["delta"]["text"]
+            if text_block is not None and block.get("contentBlockIndex") != text_block:
+                # separate text blocks the way get_car_pitch joins them
+                text = " " + text
+            text_block = block.get("contentBlockIndex")
+            parts.append(text)
+            yield text
+    except Exception as e:
+        print(f"Bedrock API Error: {e}")
+        if not parts:
+            yield fallback_pitch(car_row, priority)
+        return
+
+    pitch = "".join(parts).strip()
+    if pitch:
+        pitch_cache().put(key, pitch)
+    else:
+        print("Pitch generated but format unrecognized.")
+        yield fallback_pitch(car_row, priority)
+
+def build_messages(car_row, priority):
+    prompt = PROMPT_TEMPLATE.format(
+        year=car_row.get('year'), make=car_row.get('make'), model=car_row.get('model'),
+        priority=priority,
+        city_mpg=car_row.get('city_mpg'), acceleration=car_row.get('acceleration'), cargo_space=car_row.get('cargo_space'),
+        review_summary=car_row.get('review_summary'), features=car_row.get('features')
+    )
+    return [
+        {
+            "role": "user",
+            "content": [{"text": prompt}]
+        }
+    ]
+
+def generate_pitch(car_row, priority):
+    """Calls Bedrock converse. Returns the pitch text, or None if the call failed or came back without text."""
+    try:
+        response = bedrock_client().converse(
+            modelId=MODEL_ID, 
+            messages=build_messages(car_row, priority),
+            inferenceConfig=INFERENCE_CONFIG,
+            additionalModelRequestFields=REASONING_CONFIG
         )
         
         final_text = ""
@@ -49,8 +156,9 @@ def get_car_pitch(car_row, priority):
         if final_text.strip():
             return final_text.strip()
             
-        return "Pitch generated but format unrecognized."
+        print("Pitch generated but format unrecognized.")
+        return None
         
     except Exception as e:
         print(f"Bedrock API Error: {e}")
-        return f"This {car_row.get('model')} is a fantastic choice for {priority}."
\ No newline at end of file
+        return None
@@ -0,0 +1,40 @@
+"""
+Offline build step for the recommender artifact baked into the Lambda image.
+
+    python backend/build_artifacts.py           # catalog from the database (same env vars as the Lambda)
+    python backend/build_artifacts.py --seed    # catalog from database/seed_data.py
+"""
+import os
+import sys
+import time
+import argparse
+from car_recommender import train_recommender_model
+from model_artifacts import save_artifact, DEFAULT_ARTIFACT_PATH
+
+def load_seed_catalog():
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'database'))
+    from seed_data import seed_dataframe
+    return seed_dataframe()
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit the recommender and write it to a versioned artifact.")
+    parser.add_argument('--seed', action='store_true', help="use the seed catalog instead of the database")
+    parser.add_argument('--output', default=DEFAULT_ARTIFACT_PATH)
+    args = parser.parse_args()
+
+    from lambda_function import load_data, catalog_order, CATALOG_COLUMNS
+    if args.seed:
+        # same slim projection and row order the Lambda loads, so the catalog versions line up
+        df = catalog_order(load_seed_catalog()[CATALOG_COLUMNS])
+    else:
+        df = load_data()
+
+    start = time.perf_counter()
+    model, preprocessor = train_recommender_model(df)
+    fit_ms = (time.perf_counter() - start) * 1000
+
+    version = save_artifact(df, model, preprocessor, path=args.output)
+    print(f"✅ Wrote {args.output} (catalog version {version}, {len(df)} cars, fit {fit_ms:.1f} ms)")
+
+if __name__ == "__main__":
+    main()
@@ -1,63 +1,238 @@
+import numpy as np
 import pandas as pd
-from sklearn.neighbors import NearestNeighbors
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
-from sklearn.compose import ColumnTransformer
+from feature_index import FeatureIndex
+
+NUMERIC_FEATURES = [
+    'price', 
+    'city_mpg', 
+    'reliability_score', 
+    'luxury_score',
+    'fun_score',
+    'acceleration',   
+    'rear_legroom',   
+    'cargo_space',
+    'driver_assist_score',
+    'offroad_capability',
+    'seats'
+]
+CATEGORICAL_FEATURES = ['class', 'fuel_type']
+
+DEFAULT_TOP_K = 5
+
+# refit the scaler once a column's mean or spread has moved by more than this fraction of its scale
+REFIT_DRIFT = 0.05
+
+# how much each standardized column counts in the distance for a UI priority (unlisted columns weigh 1)
+PRIORITY_WEIGHTS = {
+    "Balanced (Value)": {},
+    "Lowest Total Cost": {'price': 3.0, 'city_mpg': 2.0, 'reliability_score': 2.0},
+    "Performance (Speed)": {'acceleration': 4.0, 'fun_score': 2.0},
+    "Utility (Cargo)": {'cargo_space': 4.0, 'seats': 2.0, 'offroad_capability': 1.5},
+    "Tech & Safety": {'driver_assist_score': 4.0, 'reliability_score': 1.5}
+}
+
+def priority_weights(priority):
+    return PRIORITY_WEIGHTS.get(priority, {})
+
+class Preprocessor:
+    """
+    Standardizes the numeric columns and one-hot encodes the categoricals
+    (unknown categories such as 'Any' encode to all zeros).
+    Same output as the old sklearn StandardScaler + OneHotEncoder ColumnTransformer.
+    """
+    def __init__(self, means, scales, vocabularies):
+        self.means = np.asarray(means, dtype=float)
+        self.scales = np.asarray(scales, dtype=float)
+        self.vocabularies = [np.asarray(v) for v in vocabularies]
+
+    @classmethod
+    def fit(cls, df):
+        values = df[NUMERIC_FEATURES].to_numpy(dtype=float)
+        means = np.nanmean(values, axis=0)
+        scales = np.sqrt(np.nanvar(values, axis=0))
+        # constant columns keep a scale of 1 instead of dividing by zero
+        scales[scales < 10 * np.finfo(float).eps] = 1.0
+        vocabularies = [np.unique(df[col].astype(str).to_numpy()) for col in CATEGORICAL_FEATURES]
+        return cls(means, scales, vocabularies)
+
+    def transform(self, df):
+        numeric = (df[NUMERIC_FEATURES].to_numpy(dtype=float) - self.means) / self.scales
+        one_hots = [
+            (df[col].astype(str).to_numpy()[:, None] == vocab[None, :]).astype(float)
+            for col, vocab in zip(CATEGORICAL_FEATURES, self.vocabularies)
+        ]
+        return np.hstack([numeric] + one_hots)
+
+    def drift(self, df, changed=None):
+        """
+        Largest shift of any numeric column's mean or scale since fit, relative to the fitted scale.
+        Infinite when a categorical value appears that has no one-hot column yet
+        (only the changed rows are checked for that when given).
+        """
+        changed = df if changed is None else changed
+        for col, vocab in zip(CATEGORICAL_FEATURES, self.vocabularies):
+            if not np.isin(changed[col].astype(str).to_numpy(), vocab).all():
+                return np.inf
+        values = df[NUMERIC_FEATURES].to_numpy(dtype=float)
+        means = np.nanmean(values, axis=0)
+        scales = np.sqrt(np.nanvar(values, axis=0))
+        mean_shift = np.abs(means - self.means) / self.scales
+        scale_shift = np.abs(scales - self.scales) / self.scales
+        return float(np.nanmax(np.concatenate([mean_shift, scale_shift])))
+
+    def column_sources(self):
+        """Source feature of every output column (one-hot columns map back to their categorical)."""
+        sources = list(NUMERIC_FEATURES)
+        for col, vocab in zip(CATEGORICAL_FEATURES, self.vocabularies):
+            sources += [col] * len(vocab)
+        return sources
+
+class NearestCars:
+    """
+    Brute-force Euclidean nearest neighbors over the preprocessed catalog matrix.
+    Weighted distances use a copy of the matrix pre-scaled by sqrt(weight), cached per weight set,
+    so a weighted query costs the same as an unweighted one.
+    """
+    def __init__(self, X):
+        self.X = np.asarray(X, dtype=float)
+        self._weighted = {}
+
+    def _scaled(self, column_weights):
+        if column_weights is None:
+            return self.X, None
+        key = tuple(column_weights)
+        if key not in self._weighted:
+            scale = np.sqrt(np.asarray(column_weights, dtype=float))
+            self._weighted[key] = (self.X * scale, scale)
+        return self._weighted[key]
+
+    def apply_delta(self, delta, X_updated, X_appended):
+        """
+        Patches the matrix (and every cached weighted copy) for a catalog_delta.CatalogDelta,
+        given the transformed rows for delta.updated and delta.appended.
+        """
+        matrices = [(self.X, None)] + list(self._weighted.values())
+        patched = []
+        for X, scale in matrices:
+            updated_rows = X_updated if scale is None else X_updated * scale
+            appended_rows = X_appended if scale is None else X_appended * scale
+            if not delta.keep.all():
+                X = X[delta.keep]
+            X[delta.updated_positions] = updated_rows
+            if len(appended_rows):
+                X = np.vstack([X, appended_rows])
+            patched.append((X, scale))
+        self.X = patched[0][0]
+        self._weighted = {key: value for key, value in zip(self._weighted, patched[1:])}
+
+    def kneighbors(self, query, n_neighbors=DEFAULT_TOP_K, candidates=None, column_weights=None):
+        """
+        Returns (distances, positions) of the n_neighbors closest rows, optionally only among candidate positions.
+        column_weights gives one weight per matrix column.
+        """
+        X, scale = self._scaled(column_weights)
+        if scale is not None:
+            query = query * scale
+        if candidates is not None:
+            X = X[candidates]
+        distances = np.sqrt(((X - query) ** 2).sum(axis=1))
+
+        k = min(n_neighbors, len(distances))
+        if k < len(distances):
+            top = np.argpartition(distances, k - 1)[:k]
+        else:
+            top = np.arange(len(distances))
+        top = top[np.lexsort((top, distances[top]))]
+
+        positions = top if candidates is None else np.asarray(candidates)[top]
+        return distances[top], positions
 
 def train_recommender_model(df):
     """
-    Trains a NearestNeighbors model and returns it along with the preprocessor.
-    """
-    numeric_features = [
-        'price', 
-        'city_mpg', 
-        'reliability_score', 
-        'luxury_score',
-        'fun_score',
-        'acceleration',   
-        'rear_legroom',   
-        'cargo_space',
-        'driver_assist_score',
-        'offroad_capability',
-        'seats'
-    ]
-    categorical_features = ['class', 'fuel_type']
-
-    preprocessor = ColumnTransformer(
-        transformers=[
-            ('num', StandardScaler(), numeric_features),
-            ('cat', OneHotEncoder(handle_unknown='ignore'), categorical_features)
-        ])
-
-    X = preprocessor.fit_transform(df)
-
-    model = NearestNeighbors(n_neighbors=len(df), algorithm='auto')
-    model.fit(X)
-    
+    Fits the preprocessor and nearest neighbor model and returns (model, preprocessor).
+    """
+    preprocessor = Preprocessor.fit(df)
+    model = NearestCars(preprocessor.transform(df))
     return model, preprocessor
 
-def get_recommendations(user_preferences, df, model, preprocessor):
+def update_recommender(model, preprocessor, delta, max_drift=REFIT_DRIFT):
     """
-    Returns car rows matching user preferences.
+    Applies a catalog delta to a fitted (model, preprocessor). Only the changed rows are transformed unless
+    the scaler statistics drifted past max_drift, in which case everything is refit.
+    Returns (model, preprocessor, refit).
+    """
+    changed = pd.concat([delta.updated, delta.appended], ignore_index=True)
+    if preprocessor.drift(delta.frame, changed) > max_drift:
+        model, preprocessor = train_recommender_model(delta.frame)
+        return model, preprocessor, True
+    model.apply_delta(delta, preprocessor.transform(delta.updated), preprocessor.transform(delta.appended))
+    return model, preprocessor, False
+
+def get_recommendations(user_preferences, df, model, preprocessor, constraints=None, top_k=DEFAULT_TOP_K, feature_index=None, weights=None):
+    """
+    Returns the top_k car rows closest to the user preferences.
+    Hard constraints are applied as a mask before the neighbor search, so only surviving cars are ranked.
+    top_k=None returns every surviving car in neighbor order.
+    Pass the catalog's FeatureIndex to avoid rebuilding it for must-have features.
+    weights maps feature name -> distance weight (see PRIORITY_WEIGHTS).
     """
     if df.empty or model is None:
         return pd.DataFrame()
 
     user_df = pd.DataFrame([user_preferences])
     
-    required_cols = [
-        'price', 'city_mpg', 'reliability_score', 'luxury_score', 'fun_score',
-        'acceleration', 'rear_legroom', 'cargo_space', 
-        'driver_assist_score', 'offroad_capability', 'seats', 'class', 'fuel_type'
-    ]
-    
-    for col in required_cols:
+    for col in NUMERIC_FEATURES + CATEGORICAL_FEATURES:
         if col not in user_df.columns:
             if col == 'class': user_df[col] = 'Any'
             elif col == 'fuel_type': user_df[col] = 'Any'
             else: user_df[col] = 0
 
-    user_vector = preprocessor.transform(user_df)
+    user_vector = preprocessor.transform(user_df)[0]
     
-    distances, indices = model.kneighbors(user_vector)
+    mask = build_constraint_mask(df, constraints, feature_index)
+    candidates = np.flatnonzero(mask)
+    if len(candidates) == 0:
+        return df.iloc[[]].copy()
+
+    k = len(candidates) if top_k is None else min(top_k, len(candidates))
+    if len(candidates) == len(df):
+        candidates = None
+
+    column_weights = None
+    if weights:
+        column_weights = [weights.get(source, 1.0) for source in preprocessor.column_sources()]
+
+    distances, positions = model.kneighbors(user_vector, n_neighbors=k, candidates=candidates, column_weights=column_weights)
+    return df.iloc[positions].copy()
+
+def build_constraint_mask(df, constraints, feature_index=None):
+    """
+    Boolean mask of cars meeting the UI's hard requirements (fuel types, max price, class, min seats, must-have features).
+    """
+    mask = np.ones(len(df), dtype=bool)
+    if not constraints:
+        return mask
+
+    fuel_types = constraints.get('fuel_types')
+    if fuel_types:
+        mask &= df['fuel_type'].isin(fuel_types).to_numpy()
+
+    max_price = constraints.get('max_price')
+    if max_price:
+        mask &= (df['price'] <= max_price).to_numpy()
+
+    target_class = constraints.get('class', 'Any')
+    if target_class and target_class != 'Any':
+        mask &= (df['class'] == target_class).to_numpy()
+
+    min_seats = constraints.get('min_seats')
+    if min_seats:
+        mask &= (df['seats'] >= min_seats).to_numpy()
+
+    desired_features = constraints.get('features') or []
+    if desired_features:
+        if feature_index is None or feature_index.size != len(df):
+            feature_index = FeatureIndex.from_frame(df)
+        mask &= feature_index.mask(desired_features)
 
-    return df.iloc[indices[0]].copy()
\ No newline at end of file
+    return mask
@@ -0,0 +1,68 @@
+import numpy as np
+import pandas as pd
+from feature_index import KEY_COLUMNS
+
+class CatalogDelta:
+    """
+    How a set of changed rows (from the cars table's row_version tracking) maps onto the in-memory catalog.
+      keep               bool mask over the old rows (False = deleted)
+      updated_positions  positions, after deletions, of rows whose values changed
+      updated            the new values for those rows (same order)
+      appended           rows that are new to the catalog, added at the end
+      frame              the patched catalog
+    """
+    def __init__(self, keep, updated_positions, updated, appended, frame):
+        self.keep = keep
+        self.updated_positions = updated_positions
+        self.updated = updated
+        self.appended = appended
+        self.frame = frame
+
+    def __len__(self):
+        return int((~self.keep).sum()) + len(self.updated) + len(self.appended)
+
+def diff_catalog(df, changes, locate):
+    """
+    Builds a CatalogDelta from the changed rows. locate(row) returns a car's current position or None
+    (FeatureIndex.position), so no pass over the whole catalog is needed to find the rows.
+    A truthy 'deleted' column marks removed cars; a car listed twice keeps its last row.
+    """
+    changes = changes.drop_duplicates(KEY_COLUMNS, keep='last').reset_index(drop=True)
+    if 'deleted' in changes.columns:
+        deleted = changes['deleted'].fillna(False).astype(bool).to_numpy()
+    else:
+        deleted = np.zeros(len(changes), dtype=bool)
+    positions = [locate(row) for row in changes[KEY_COLUMNS].to_dict(orient='records')]
+
+    keep = np.ones(len(df), dtype=bool)
+    updated_rows, updated_old, appended_rows = [], [], []
+    for i, pos in enumerate(positions):
+        if deleted[i]:
+            if pos is not None:
+                keep[pos] = False
+        elif pos is None:
+            appended_rows.append(i)
+        else:
+            updated_rows.append(i)
+            updated_old.append(pos)
+
+    # old position -> position once deleted rows are gone
+    new_positions = np.cumsum(keep) - 1
+    updated_positions = new_positions[np.asarray(updated_old, dtype=int)]
+    updated = changes.iloc[updated_rows].reset_index(drop=True)
+    appended = changes.iloc[appended_rows].reset_index(drop=True)
+
+    columns = [col for col in df.columns if col in changes.columns]
+    frame = df[keep].reset_index(drop=True) if not keep.all() else df.copy()
+    for col in columns if len(updated) else []:
+        values = updated[col]
+        if values.dtype != frame[col].dtype:
+            # upcast to what concat would pick (e.g. int prices patched with float ones)
+            common = pd.concat([frame[col].iloc[:0], values.iloc[:0]]).dtype
+            frame[col] = frame[col].astype(common)
+            values = values.astype(common)
+        frame.iloc[updated_positions, frame.columns.get_loc(col)] = values.to_numpy()
+    if len(appended):
+        frame = pd.concat([frame, appended[columns]], ignore_index=True)
+
+    return CatalogDelta(keep, updated_positions, updated, appended, frame)
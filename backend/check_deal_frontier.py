@@ -0,0 +1,41 @@
+"""
+Checks scenario_calculator.optimize_deal on the seed catalog: with the default upfront cap the frontier has to
+offer more than one down payment / due-at-signing level (putting more down lowers both cash flow and total cost,
+so a frontier that ignores the upfront cash collapses to max_upfront), and no frontier deal may be beaten on
+both Monthly Outlay and Total True Cost by another one. Run it after touching the deal search.
+
+    python backend/check_deal_frontier.py
+"""
+import os
+import sys
+from scenario_calculator import optimize_deal
+from check_parity import load_seed_catalog
+
+INPUTS = [
+    {'years': years, 'apr': apr, 'gas_price': 3.5, 'elec_price': 0.16}
+    for years in [3, 5, 7] for apr in [0, 4.0, 6.9, 10.0]
+]
+
+def main():
+    df = load_seed_catalog()
+    checked, failures = 0, 0
+    for row in df.to_dict(orient='records'):
+        for inputs in INPUTS:
+            checked += 1
+            frontier = optimize_deal(row, inputs)['frontier']
+            levels = {deal['upfront'] for deal in frontier}
+            # frontier values are rounded to cents, so a deal only counts as beaten by a cent or more on both
+            dominated = [
+                a for a in frontier for b in frontier
+                if b['Monthly Outlay'] <= a['Monthly Outlay'] - 0.01 and b['Total True Cost'] <= a['Total True Cost'] - 0.01
+            ]
+            if len(levels) < 2 or dominated:
+                failures += 1
+                if failures <= 5:
+                    print(f"{row['make']} {row['model']} {inputs}: {len(levels)} upfront levels, {len(dominated)} dominated deals")
+
+    print(f"{failures} bad frontiers in {checked} car x inputs cases")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Checks that vector_calculator.calculate_tco_vectorized returns exactly what cost_calculator.calculate_tco
+returns, car by car, over a grid of inputs on the seed catalog, and that calculate_cost_curve's cumulative
+true cost at the horizon matches Monthly True Cost x horizon months. Run it after touching either engine.
+
+    python backend/check_parity.py
+    python backend/check_parity.py --cases 12    # random input draws per method/climate/terrain/commute cell
+"""
+import os
+import sys
+import random
+import argparse
+import numpy as np
+from cost_calculator import calculate_tco, calculate_cost_curve
+from vector_calculator import calculate_tco_vectorized
+
+def load_seed_catalog():
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'database'))
+    from seed_data import seed_dataframe
+    return seed_dataframe()
+
+def input_grid(cases, seed=0):
+    """Every method x climate x terrain x mileage mode, with `cases` random draws of the other inputs each."""
+    rng = random.Random(seed)
+    for method in ['Cash', 'Finance', 'Lease']:
+        for climate in ['Moderate', 'Cold (Winter)', 'Hot (Summer)']:
+            for terrain in ['Flat', 'Hilly', 'Mountainous']:
+                for commute in [True, False]:
+                    for _ in range(cases):
+                        inputs = {
+                            'method': method, 'climate': climate, 'terrain': terrain,
+                            'years': rng.choice([1, 2.5, 3, 5, 7]),
+                            'gas_price': rng.choice([2.99, 3.5, 4.1]), 'elec_price': 0.16,
+                            'driver_age': rng.choice([17, 19, 23, 30, 75]),
+                            'custom_insurance': rng.choice([0, 0, 150]),
+                            'apr': rng.choice([0, 6.0, 7.9]), 'term': rng.choice([36, 60, 72]),
+                            'down_payment': rng.choice([0, 2000]),
+                            'lease_monthly': rng.choice([0, 450]), 'lease_due': rng.choice([0, 2500]),
+                            'lease_term': rng.choice([24, 36])
+                        }
+                        if commute:
+                            inputs.update({
+                                'commute_dist': rng.choice([20, 300]), 'days_week': 5,
+                                'commute_type': rng.choice(['Mixed', 'Mostly City', 'Mostly Highway']),
+                                'road_trip_miles': 1000, 'other_miles': 50
+                            })
+                        yield inputs
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the scalar and vectorized TCO engines.")
+    parser.add_argument('--cases', type=int, default=6)
+    args = parser.parse_args()
+
+    df = load_seed_catalog()
+    rows = df.to_dict(orient='records')
+    checked, mismatches, curve_mismatches = 0, 0, 0
+    for inputs in input_grid(args.cases):
+        vec = calculate_tco_vectorized(df, inputs)
+        months = int(inputs['years'] * 12)
+        for i, row in enumerate(rows):
+            checked += 1
+            scalar = calculate_tco(row, inputs)
+            for name, value in scalar.items():
+                got = vec[name].iloc[i]
+                if got != value and not (isinstance(value, float) and np.isnan(value)):
+                    mismatches += 1
+                    if mismatches <= 5:
+                        print(f"{row['make']} {row['model']} {name}: scalar {value} vs vector {got} for {inputs}")
+
+            # the curve is rounded per cumulative month, Monthly True Cost per month
+            curve_total = calculate_cost_curve(row, inputs)['true_cost'][months - 1]
+            if abs(curve_total - scalar['Monthly True Cost'] * months) > 0.005 * months + 0.01:
+                curve_mismatches += 1
+                if curve_mismatches <= 5:
+                    print(f"{row['make']} {row['model']} curve: {curve_total} vs {scalar['Monthly True Cost']} x {months} for {inputs}")
+
+    print(f"{mismatches} mismatches in {checked} car x inputs cases, {curve_mismatches} curve/horizon mismatches")
+    sys.exit(1 if mismatches or curve_mismatches else 0)
+
+if __name__ == "__main__":
+    main()
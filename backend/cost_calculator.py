@@ -1,4 +1,7 @@
-from financial_engine import calculate_loan_payment
+from financial_engine import calculate_loan_payment, calculate_interest_paid, amortization_schedule
+
+# longest horizon calculate_cost_curve covers (15 years, the Deal Analyzer's max)
+CURVE_MONTHS = 180
 
 def _get_mileage_and_efficiency(car_row, inputs):
     # annual mileage city/hwy split
@@ -108,6 +111,17 @@ def _calculate_operational_costs(car_row, inputs, annual_miles, adj_mpg, eff_mod
 
     return monthly_fuel, monthly_maint, monthly_ins
 
+def _predict_value(car_row, years, resale_model):
+    if resale_model:
+        try:
+            return resale_model.predict_future_value(car_row, years)
+        except:
+            pass
+    # Fallback (years can also be a NumPy array of horizons)
+    price = car_row.get('price', 30000)
+    dep_modifier = 1.2 if car_row.get('luxury_score', 5) > 7 else 1.0
+    return price * ((1 - (0.12 * dep_modifier)) ** years)
+
 def _calculate_financials(car_row, inputs, years, resale_model):
     buying_method = inputs.get('method', 'Cash')
     price = car_row.get('price', 30000)
@@ -118,14 +132,7 @@ def _calculate_financials(car_row, inputs, years, resale_model):
     monthly_depreciation = 0.0
 
     def predict_value():
-        if resale_model:
-            try:
-                return resale_model.predict_future_value(car_row, years)
-            except:
-                pass
-        # Fallback
-        dep_modifier = 1.2 if car_row.get('luxury_score', 5) > 7 else 1.0
-        return price * ((1 - (0.12 * dep_modifier)) ** years)
+        return _predict_value(car_row, years, resale_model)
 
     if buying_method == 'Cash':
         future_value = predict_value()
@@ -183,12 +190,11 @@ def calculate_tco(car_row, inputs, resale_model=None):
     buying_method = inputs.get('method', 'Cash')
     
     if buying_method == 'Finance':
-        # TCO = Ops + Dep + Interest (simplified approximation via payment diff)
-        # Interest paid ≈ (Total Payments + Down) - Price
+        # TCO = Ops + Dep + Interest actually paid within the horizon (front-loaded, and none after the last payment)
         term = inputs.get('term', 60)
-        total_paid_loan = (m_pmt * term) + inputs.get('down_payment', 0)
-        total_interest = total_paid_loan - car_row.get('price', 30000)
-        avg_monthly_interest = total_interest / term if term > 0 else 0
+        loan_amount = car_row.get('price', 30000) - inputs.get('down_payment', 0)
+        apr = inputs.get('apr', 6.0)
+        avg_monthly_interest = calculate_interest_paid(loan_amount, apr, term, years * 12) / (years * 12)
         m_tco = m_ops + m_dep + avg_monthly_interest
         
     elif buying_method == 'Lease':
@@ -201,6 +207,16 @@ def calculate_tco(car_row, inputs, resale_model=None):
         # TCO = Ops + Depreciation (Loss of asset value)
         m_tco = m_ops + m_dep
 
+    # 5 year total even when the analysis horizon is something else (only depreciation and loan interest depend on it)
+    if years == 5 or buying_method not in ('Cash', 'Finance'):
+        m_tco_5yr = m_tco
+    else:
+        m_dep_5yr = (car_row.get('price', 30000) - _predict_value(car_row, 5, resale_model)) / 60
+        if buying_method == 'Finance':
+            m_tco_5yr = m_ops + m_dep_5yr + calculate_interest_paid(loan_amount, apr, term, 60) / 60
+        else:
+            m_tco_5yr = m_tco - m_dep + m_dep_5yr
+
     return {
         'buying_method': buying_method,
         'Monthly Payment': round(m_pmt, 2),
@@ -211,8 +227,79 @@ def calculate_tco(car_row, inputs, resale_model=None):
         'Upfront Cost': round(upfront, 2),
         'Monthly Cash Flow': round(m_cash_flow, 2), 
         'Monthly True Cost': round(m_tco, 2), 
-        'Total 5yr Cost': round(m_tco * 60, 2),
+        'Total 5yr Cost': round(m_tco_5yr * 60, 2),
         'Calculated Annual Miles': round(annual_miles, 0),
         'Est MPG': round(adj_mpg, 1),
         'Resale Value': round(future_val, 0)
-    }
\ No newline at end of file
+    }
+
+def calculate_cost_curve(car_row, inputs, resale_model=None, months=CURVE_MONTHS):
+    """
+    Month-by-month cumulative costs for months 1..months from a single evaluation, so any horizon is a lookup
+    (curve['true_cost'][12 * N - 1] is calculate_tco's Monthly True Cost for years=N, times 12 * N).
+    Returns lists:
+      month, true_cost (ops + depreciation + interest), cash_out (money actually spent),
+      value (depreciation path), loan_balance, equity (value - loan_balance),
+      and for Finance the loan's amortization schedule: interest, principal.
+    Leases are assumed to be re-signed on the same terms every lease_term months.
+    """
+    # numpy stays out of the scalar calculate path
+    import numpy as np
+
+    annual_miles, adj_mpg, eff_modifier = _get_mileage_and_efficiency(car_row, inputs)
+    m_fuel, m_maint, m_ins = _calculate_operational_costs(car_row, inputs, annual_miles, adj_mpg, eff_modifier)
+    m_pmt, _, upfront, _ = _calculate_financials(car_row, inputs, inputs.get('years', 5), resale_model)
+    m_ops = m_fuel + m_maint + m_ins
+
+    buying_method = inputs.get('method', 'Cash')
+    price = car_row.get('price', 30000)
+    month = np.arange(1, months + 1)
+    ops = m_ops * month
+    zeros = np.zeros(months)
+    curve = {}
+
+    if buying_method in ('Cash', 'Finance'):
+        years = month / 12
+        if hasattr(resale_model, 'predict_future_value_many'):
+            value = resale_model.predict_future_value_many([car_row], years)[0]
+        elif resale_model:
+            value = np.array([_predict_value(car_row, float(y), resale_model) for y in years])
+        else:
+            value = np.asarray(_predict_value(car_row, years, None), dtype=float)
+        depreciation = price - value
+
+    if buying_method == 'Finance':
+        term = inputs.get('term', 60)
+        down_payment = inputs.get('down_payment', 0)
+        schedule = amortization_schedule(price - down_payment, inputs.get('apr', 6.0), term, months)
+        # interest as it is actually paid, same as calculate_tco's Monthly True Cost
+        true_cost = ops + depreciation + np.cumsum(schedule['interest'])
+        cash_out = down_payment + np.cumsum(schedule['payment']) + ops
+        loan_balance = schedule['balance']
+        curve['interest'] = schedule['interest']
+        curve['principal'] = schedule['principal']
+
+    elif buying_method == 'Lease':
+        lease_term = inputs.get('lease_term', 36)
+        amortized_down = (upfront / lease_term) if lease_term > 0 else 0
+        true_cost = (m_ops + m_pmt + amortized_down) * month
+        signings = np.ceil(month / lease_term) if lease_term > 0 else 1
+        cash_out = upfront * signings + m_pmt * month + ops
+        value = zeros
+        loan_balance = zeros
+
+    else: # Cash
+        true_cost = ops + depreciation
+        cash_out = price + ops
+        loan_balance = zeros
+
+    curve.update({
+        'true_cost': true_cost,
+        'cash_out': cash_out,
+        'value': value,
+        'loan_balance': loan_balance,
+        'equity': value - loan_balance
+    })
+    result = {'month': month.tolist()}
+    result.update({name: np.round(values, 2).tolist() for name, values in curve.items()})
+    return result
@@ -0,0 +1,150 @@
+import json
+import os
+import time
+
+DEFAULT_REGION = 'us-east-1'
+SECRET_NAME_PREFIX = 'perfect-car-picker'
+
+# discovery results survive warm invokes in module memory and in /tmp (shared by re-imports in the same container)
+CACHE_PATH = os.environ.get('DB_DISCOVERY_CACHE', '/tmp/db_discovery.json')
+CACHE_TTL = int(os.environ.get('DB_DISCOVERY_TTL', 900))
+
+class DbDiscovery:
+    """
+    Finds the RDS endpoint and the DB password secret once and caches them with a TTL.
+    client_factory(service_name, region) returns a boto3-style client, so a moto or hand-rolled
+    stub can be swapped in for tests.
+    The password itself only lives in memory; /tmp gets the endpoint and the secret *name*.
+    """
+    def __init__(self, client_factory=None, region=DEFAULT_REGION, cache_path=CACHE_PATH, ttl=CACHE_TTL, clock=time.time):
+        self._client_factory = client_factory or _boto3_client
+        self.region = region
+        self.cache_path = cache_path
+        self.ttl = ttl
+        self._clock = clock
+        self._memory = {}
+        self._clients = {}
+
+    def _client(self, service_name):
+        if service_name not in self._clients:
+            self._clients[service_name] = self._client_factory(service_name, self.region)
+        return self._clients[service_name]
+
+    # cache
+    def _read_disk(self):
+        if not self.cache_path:
+            return {}
+        try:
+            with open(self.cache_path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _get(self, key):
+        entry = self._memory.get(key)
+        if entry is None:
+            entry = self._read_disk().get(key)
+        if entry is None or self._clock() - entry['at'] > self.ttl:
+            return None
+        self._memory[key] = entry
+        return entry['value']
+
+    def _put(self, key, value, persist=True):
+        entry = {'value': value, 'at': self._clock()}
+        self._memory[key] = entry
+        if not persist or not self.cache_path:
+            return
+        disk = self._read_disk()
+        disk[key] = entry
+        try:
+            tmp_path = self.cache_path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(disk, f)
+            os.replace(tmp_path, self.cache_path)
+        except OSError as e:
+            print(f"Could not write discovery cache: {e}")
+
+    def invalidate(self):
+        """Drops every cached value (e.g. after a failed connection with a stale endpoint or rotated password)."""
+        self._memory.clear()
+        if self.cache_path and os.path.exists(self.cache_path):
+            try:
+                os.remove(self.cache_path)
+            except OSError:
+                pass
+
+    # rds
+    def db_host(self, db_name):
+        """Returns (endpoint address, master username) for the instance named db_name, or (None, None)."""
+        key = f"rds:{self.region}:{db_name}"
+        cached = self._get(key)
+        if cached:
+            return tuple(cached)
+
+        instance = self._find_instance(db_name)
+        if instance is None:
+            print("Could not find a matching RDS instance via boto3.")
+            return None, None
+
+        result = (instance.get('Endpoint', {}).get('Address'), instance.get('MasterUsername'))
+        print(f"Found RDS endpoint dynamically: {result[0]}")
+        self._put(key, list(result))
+        return result
+
+    def _find_instance(self, db_name):
+        rds = self._client('rds')
+        # direct lookup by identifier first, one call instead of listing every instance
+        try:
+            instances = rds.describe_db_instances(DBInstanceIdentifier=db_name).get('DBInstances', [])
+            if instances:
+                return instances[0]
+        except Exception as e:
+            print(f"Direct RDS lookup for '{db_name}' failed ({e}), scanning instances...")
+
+        for page in rds.get_paginator('describe_db_instances').paginate():
+            for instance in page.get('DBInstances', []):
+                if db_name in (instance.get('DBInstanceIdentifier'), instance.get('DBName')):
+                    return instance
+        return None
+
+    # secrets manager
+    def db_pass(self, secret_name=None):
+        """
+        Returns the DB password. With a known secret_name this is a single get_secret_value call;
+        otherwise the first secret whose name contains SECRET_NAME_PREFIX is used.
+        """
+        secret_name = secret_name or self._get(f"secret_name:{self.region}") or self._find_secret_name()
+        if not secret_name:
+            raise Exception("No matching secret found in AWS Secrets Manager.")
+
+        key = f"secret:{self.region}:{secret_name}"
+        cached = self._get(key)
+        if cached:
+            return cached
+
+        value = self._client('secretsmanager').get_secret_value(SecretId=secret_name)['SecretString']
+        self._put(f"secret_name:{self.region}", secret_name)
+        self._put(key, value, persist=False)
+        return value
+
+    def _find_secret_name(self):
+        paginator = self._client('secretsmanager').get_paginator('list_secrets')
+        pages = paginator.paginate(Filters=[{'Key': 'name', 'Values': [SECRET_NAME_PREFIX]}])
+        for page in pages:
+            for secret in page.get('SecretList', []):
+                if SECRET_NAME_PREFIX in secret.get('Name', ''):
+                    return secret['Name']
+        return None
+
+def _boto3_client(service_name, region):
+    import boto3
+    return boto3.client(service_name, region_name=region)
+
+_default = None
+
+def default_discovery():
+    """Process-wide DbDiscovery, created on first use."""
+    global _default
+    if _default is None:
+        _default = DbDiscovery()
+    return _default
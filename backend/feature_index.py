@@ -0,0 +1,137 @@
+import re
+import numpy as np
+import pandas as pd
+
+# UI must-have -> words that show up in the feature/assist/review text
+FEATURE_ALIASES = {
+    "Apple CarPlay": ["carplay", "apple carplay", "apple"],
+    "Android Auto": ["android auto", "android"],
+    "Leather": ["leather", "nappa", "vernasca", "startex"],
+    "Sunroof": ["sunroof", "moonroof", "panoramic", "solar roof", "glass roof"],
+    "AWD": ["awd", "4wd", "all-wheel", "four-wheel", "quattro", "xdrive", "4motion"],
+    "Heated Seats": ["heated", "climate package"],
+    "Autopilot": ["autopilot", "bluecruise", "super cruise", "highway driving", "hands-free", "traffic jam", "driving assistant"],
+    "3rd Row": ["3rd row", "third row"],
+    "Tow Package": ["tow", "towing", "trailer", "hitch"]
+}
+
+INDEXED_COLUMNS = ['features', 'driver_assist_name', 'review_summary']
+KEY_COLUMNS = ['make', 'model', 'year']
+
+class FeatureIndex:
+    """
+    Inverted index of must-have feature -> bitmap of car positions.
+    Built once when the catalog loads; filtering on features is then a bitmap intersection.
+    Shared by the backend recommender and the frontend.
+    """
+    def __init__(self, texts, seats=None, keys=None, aliases=FEATURE_ALIASES):
+        self.size = len(texts)
+        self._texts = _normalize(texts)
+        self._seats = np.asarray(seats if seats is not None else [5] * self.size, dtype=float)
+        self._aliases = aliases
+        self._positions = {key: pos for pos, key in enumerate(keys)} if keys is not None else {}
+        self._postings = {feature: self._scan(feature) for feature in aliases}
+
+    @classmethod
+    def from_frame(cls, df):
+        """Index the text columns of a cars DataFrame (row order = car position)."""
+        texts, seats, keys = _frame_columns(df)
+        return cls(texts, seats=seats, keys=keys)
+
+    def _scan(self, feature, texts=None, seats=None):
+        texts = self._texts if texts is None else texts
+        seats = self._seats if seats is None else seats
+        aliases = [re.escape(a.lower()) for a in self._aliases.get(feature, [feature.lower()])]
+        bitmap = texts.str.contains("|".join(aliases), regex=True).to_numpy(dtype=bool, copy=True)
+        if feature == "3rd Row":
+            bitmap |= seats >= 7
+        return bitmap
+
+    def apply_delta(self, delta):
+        """
+        Patches the index in place for a catalog_delta.CatalogDelta: drops deleted rows and re-scans
+        only the updated and appended rows.
+        """
+        keep = delta.keep
+        if not keep.all():
+            self._texts = self._texts[keep].reset_index(drop=True)
+            self._seats = self._seats[keep]
+            self._postings = {feature: bitmap[keep] for feature, bitmap in self._postings.items()}
+
+        if len(delta.updated):
+            texts, seats, _ = _frame_columns(delta.updated)
+            texts = _normalize(texts)
+            seats = np.asarray(seats if seats is not None else [5] * len(texts), dtype=float)
+            positions = delta.updated_positions
+            self._texts.iloc[positions] = texts.to_numpy()
+            self._seats[positions] = seats
+            for feature, bitmap in self._postings.items():
+                bitmap[positions] = self._scan(feature, texts, seats)
+
+        if len(delta.appended):
+            texts, seats, _ = _frame_columns(delta.appended)
+            texts = _normalize(texts)
+            seats = np.asarray(seats if seats is not None else [5] * len(texts), dtype=float)
+            for feature, bitmap in self._postings.items():
+                self._postings[feature] = np.concatenate([bitmap, self._scan(feature, texts, seats)])
+            self._texts = pd.concat([self._texts, texts], ignore_index=True)
+            self._seats = np.concatenate([self._seats, seats])
+
+        self.size = len(self._texts)
+        if not keep.all():
+            self._positions = {key: pos for pos, key in enumerate(_frame_columns(delta.frame)[2] or [])}
+        else:
+            start = self.size - len(delta.appended)
+            keys = _frame_columns(delta.appended)[2] or []
+            self._positions.update({key: start + i for i, key in enumerate(keys)})
+
+    def postings(self, feature):
+        """Bitmap of cars that have one feature. Features outside the alias table are scanned once and memoized."""
+        if feature not in self._postings:
+            self._postings[feature] = self._scan(feature)
+        return self._postings[feature]
+
+    def mask(self, features):
+        """Bitmap of cars that have every requested feature."""
+        bitmap = np.ones(self.size, dtype=bool)
+        for feature in features or []:
+            bitmap &= self.postings(feature)
+        return bitmap
+
+    def car_ids(self, features):
+        """Sorted positions of cars that have every requested feature."""
+        return np.flatnonzero(self.mask(features))
+
+    def position(self, car):
+        """Row position of a car (row dict/Series, looked up by make/model/year), or None."""
+        return self._positions.get(car_key(car))
+
+    def matched_features(self, car, features):
+        """Requested features a single car (row dict/Series, looked up by make/model/year) has."""
+        pos = self.position(car)
+        if pos is None:
+            return []
+        return [f for f in features or [] if self.postings(f)[pos]]
+
+def _normalize(texts):
+    return pd.Series(texts, dtype=object).fillna('').astype(str).str.lower().reset_index(drop=True)
+
+def _frame_columns(df):
+    """(texts, seats, keys) the index is built from, for a cars DataFrame."""
+    texts = pd.Series([''] * len(df), dtype=object)
+    for col in INDEXED_COLUMNS:
+        if col in df.columns:
+            texts = texts + ' | ' + df[col].fillna('').astype(str).reset_index(drop=True)
+    seats = df['seats'].fillna(5).tolist() if 'seats' in df.columns else None
+    keys = None
+    if all(c in df.columns for c in KEY_COLUMNS):
+        keys = [car_key(row) for row in df[KEY_COLUMNS].to_dict(orient='records')]
+    return texts, seats, keys
+
+def car_key(car):
+    make, model, year = (car.get(c) for c in KEY_COLUMNS)
+    try:
+        year = int(year)
+    except (TypeError, ValueError):
+        pass
+    return (str(make), str(model), str(year))
@@ -16,4 +16,91 @@ def calculate_lease_effective_cost(monthly_payment, down_payment, fees, months):
     Calculates the effective monthly cost of a lease (Amortizing down payment + fees).
     """
     total_lease_cost = (monthly_payment * months) + down_payment + fees
-    return total_lease_cost / months
\ No newline at end of file
+    return total_lease_cost / months
+
+def calculate_loan_payments(principal, rate, months):
+    """
+    Vectorized calculate_loan_payment. Any argument can be a NumPy array; they broadcast together.
+    """
+    # numpy stays out of the scalar import path
+    import numpy as np
+
+    principal = np.asarray(principal, dtype=float)
+    rate = np.asarray(rate, dtype=float)
+    months = np.asarray(months, dtype=float)
+
+    monthly_rate = (rate / 100) / 12
+    with np.errstate(divide='ignore', invalid='ignore'):
+        growth = (1 + monthly_rate)**months
+        payment = principal * (monthly_rate * growth) / (growth - 1)
+        return np.where(rate <= 0, principal / months, payment)
+
+def calculate_interest_paid(principal, rate, months, horizon):
+    """
+    Interest actually paid in the first `horizon` whole months of a calculate_loan_payment loan
+    (amortization_schedule's interest summed, in closed form). Nothing accrues after the last payment.
+    """
+    paid_months = min(int(horizon), months)
+    if months <= 0 or principal <= 0 or rate <= 0 or paid_months <= 0:
+        return 0.0
+
+    payment = calculate_loan_payment(principal, rate, months)
+    if paid_months >= months:
+        return payment * months - principal
+    monthly_rate = (rate / 100) / 12
+    growth = (1 + monthly_rate)**paid_months
+    balance = principal * growth - payment * (growth - 1) / monthly_rate
+    # every payment is interest plus the principal it retired
+    return payment * paid_months - (principal - balance)
+
+def amortization_schedule(principal, rate, months, horizon=None):
+    """
+    Month-by-month schedule for a standard amortizing loan, months 1..horizon (default: the longest loan term).
+    Any argument can be a NumPy array (e.g. a grid of down payments x terms); they broadcast together and
+    the months run along a new last axis.
+    Returns NumPy arrays: payment, interest, principal (paid that month) and balance (left after it).
+    Everything is zero once the loan is paid off.
+    """
+    import numpy as np
+
+    principal, rate, months = np.broadcast_arrays(*(np.asarray(v, dtype=float) for v in (principal, rate, months)))
+    horizon = int(months.max(initial=0) if horizon is None else horizon)
+    month = np.arange(1, horizon + 1)
+    principal, rate, months = principal[..., None], rate[..., None], months[..., None]
+    has_loan = (months > 0) & (principal > 0)
+
+    monthly_rate = np.where(rate > 0, (rate / 100) / 12, 0.0)
+    paid_months = np.minimum(month, months)
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        payment = calculate_loan_payments(principal, rate, months)
+        growth = (1 + monthly_rate)**paid_months
+        balance = np.where(monthly_rate > 0, principal * growth - payment * (growth - 1) / monthly_rate, principal - payment * paid_months)
+    # no float residue left after the last payment
+    balance = np.where(has_loan & (month < months), np.maximum(balance, 0.0), 0.0)
+
+    active = has_loan & (month <= months)
+    opening = np.concatenate([np.broadcast_to(principal, balance.shape[:-1] + (1,)), balance], axis=-1)[..., :-1]
+    interest = np.where(active, opening * monthly_rate, 0.0)
+    payments = np.where(active, payment, 0.0)
+    return {
+        'payment': payments,
+        'interest': interest,
+        'principal': payments - interest,
+        'balance': balance
+    }
+
+def calculate_lease_payments(price, due_at_signing, residual_value, months, money_factor):
+    """
+    Vectorized standard lease payment. Money due at signing is a cap cost reduction, so it lowers the payment:
+      depreciation fee = (price - due - residual) / months
+      finance fee      = (price - due + residual) * money_factor   (money factor = APR / 2400)
+    Any argument can be a NumPy array; they broadcast together.
+    """
+    import numpy as np
+
+    cap_cost = np.asarray(price, dtype=float) - np.asarray(due_at_signing, dtype=float)
+    residual_value = np.asarray(residual_value, dtype=float)
+    months = np.asarray(months, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        depreciation_fee = (cap_cost - residual_value) / months
+    return depreciation_fee + (cap_cost + residual_value) * money_factor
@@ -1,48 +1,103 @@
+import base64
+import bisect
 import json
 import os
-import pandas as pd
-import sqlalchemy
-import boto3
-from cost_calculator import calculate_tco
-from car_recommender import train_recommender_model, get_recommendations
-from ai_advisor import get_car_pitch
+import sys
+import time
+import importlib
+from contextlib import contextmanager
+from cost_calculator import calculate_tco, calculate_cost_curve
+from response_cache import ResponseCache, request_key
+
+# memoized response bodies; recommend keys include the catalog version and the whole cache is dropped on refresh
+CACHED_ACTIONS = {'calculate', 'calculate_batch', 'calculate_distribution', 'sweep', 'optimize_deal', 'recommend'}
+_response_cache = ResponseCache(int(os.environ.get('RESPONSE_CACHE_SIZE', 512)))
+
+# init profiling: timings collected since the last report, flushed as one structured log line per invoke
+_init_timings = {}
+# timers nest (db load includes import pandas), so the total only counts the outermost ones
+_init_total_ms = 0.0
+_timer_depth = 0
+_cold_start = True
+
+@contextmanager
+def _timed(label):
+    global _init_total_ms, _timer_depth
+    start = time.perf_counter()
+    _timer_depth += 1
+    try:
+        yield
+    finally:
+        _timer_depth -= 1
+        elapsed = (time.perf_counter() - start) * 1000
+        _init_timings[label] = round(elapsed, 1)
+        if _timer_depth == 0:
+            _init_total_ms += elapsed
+
+def _load(module_name):
+    """
+    Imports a module the first time an action needs it, so calculate never pays for pandas/numpy
+    and pitch only pays for boto3.
+    """
+    if module_name not in sys.modules:
+        with _timed(f"import {module_name}"):
+            importlib.import_module(module_name)
+    return sys.modules[module_name]
+
+def _emit_init_report(action):
+    global _cold_start, _init_total_ms
+    if not _init_timings:
+        return
+    print(json.dumps({
+        'event': 'init_report',
+        'action': action,
+        'cold_start': _cold_start,
+        'timings_ms': dict(_init_timings),
+        'total_ms': round(_init_total_ms, 1)
+    }))
+    _init_timings.clear()
+    _init_total_ms = 0.0
+    _cold_start = False
 
 def get_db_host(db_name):
     try:
-        print(f"DB_HOST missing from Env Vars. Attempting to find RDS endpoint for DBName '{db_name}' via boto3...")
-        rds_client = boto3.client('rds', region_name='us-east-1')
-        response = rds_client.describe_db_instances()
-        for instance in response.get('DBInstances', []):
-            if instance.get('DBInstanceIdentifier') == db_name:
-                db_host = instance.get('Endpoint', {}).get('Address')
-                db_user = instance.get('MasterUsername')
-                print(f"Found RDS endpoint dynamically: {db_host}")
-                return db_host, db_user
-        if not db_host:
-            print("Could not find a matching RDS instance via boto3.")
+        print(f"DB_HOST missing from Env Vars. Resolving RDS endpoint for DBName '{db_name}'...")
+        with _timed('rds discovery'):
+            return _load('db_discovery').default_discovery().db_host(db_name)
     except Exception as e:
         print(f"Failed to fetch RDS endpoint via boto3: {e}")
+        return None, None
 
 def get_db_pass(aws_region='us-east-1'):
     print("Retrieving database password from AWS Secrets Manager...")
     try:
-        secrets_client = boto3.client('secretsmanager', region_name=aws_region)
-
-        response = secrets_client.list_secrets()
-        
-        for secret in response.get('SecretList'):
-            if 'perfect-car-picker' in secret.get('Name'):
-                secret_name = secret.get('Name')
-                db_pass = secrets_client.get_secret_value(SecretId=secret_name)['SecretString']
-                return db_pass
-        else:
-            raise Exception("No matching secret found in AWS Secrets Manager.")
-        
+        # DB_SECRET_NAME skips the list_secrets scan entirely
+        with _timed('secret discovery'):
+            return _load('db_discovery').default_discovery().db_pass(os.environ.get('DB_SECRET_NAME'))
     except Exception as e:
         print(f"Failed to fetch secret: {e}")
 
-def load_data():
-    print("--- 🔍 DB LOAD INITIATED ---")
+# columns the recommender, TCO math and filters read; everything else is free text fetched on demand
+CATALOG_COLUMNS = [
+    'make', 'model', 'year', 'class', 'price', 'city_mpg', 'hwy_mpg', 'fuel_type',
+    'reliability_score', 'luxury_score', 'cargo_space', 'rear_legroom', 'acceleration',
+    'driver_assist_score', 'offroad_capability', 'seats', 'fun_score'
+]
+DETAIL_COLUMNS = ['features', 'review_summary', 'driver_assist_name', 'driver_assist_link']
+KEY_COLUMNS = ['make', 'model', 'year']
+DETAIL_KEY_LIMIT = 50
+
+# one pooled engine per container, reused by every warm invoke
+_engine = None
+
+def database_url():
+    """
+    Postgres URL from env vars / AWS discovery, or DATABASE_URL when set (e.g. sqlite:///database/cars.db locally).
+    None when there is no database to talk to.
+    """
+    if os.environ.get('DATABASE_URL'):
+        return os.environ['DATABASE_URL']
+
     db_user = os.environ.get('DB_USER', '')
     db_pass = os.environ.get('DB_PASS')
     db_name = os.environ.get('DB_NAME', 'cardb')
@@ -59,20 +114,141 @@ def load_data():
         db_pass = get_db_pass()
 
     if db_host and db_pass:
-        try:
-            print(f"Attempting connection to PostgreSQL at {db_host}...")
-            db_url = f"postgresql+psycopg2://{db_user}:{db_pass}@{db_host}:5432/{db_name}"
-            # Short timeout so Lambda doesn't hang forever if networking fails
-            engine = sqlalchemy.create_engine(db_url, connect_args={'connect_timeout': 5})
-            df = pd.read_sql("SELECT * FROM cars", engine)
-            print(f"SUCCESS: Loaded {len(df)} vehicles from RDS.")
-            return df
-        except Exception as e:
-            print(f"RDS Connection Failed: {e}")
-            print("Falling back to static static data.")
-
-    # fallback
+        return f"postgresql+psycopg2://{db_user}:{db_pass}@{db_host}:5432/{db_name}"
+    return None
+
+def get_engine():
+    global _engine
+    if _engine is not None:
+        return _engine
+
+    db_url = database_url()
+    if not db_url:
+        return None
+    sqlalchemy = _load('sqlalchemy')
+    options = {}
+    if db_url.startswith('postgresql'):
+        # Short timeout so Lambda doesn't hang forever if networking fails
+        options['connect_args'] = {'connect_timeout': 5}
+    # a Lambda container serves one request at a time: keep one connection, ping it after idle freezes,
+    # and recycle before RDS/NAT idle timeouts drop it
+    _engine = sqlalchemy.create_engine(db_url, pool_size=1, max_overflow=1, pool_pre_ping=True, pool_recycle=300, **options)
+    return _engine
+
+def reset_engine():
+    """Drops the pooled engine so the next query reconnects (and rediscovers the endpoint)."""
+    global _engine
+    if _engine is not None:
+        _engine.dispose()
+    _engine = None
+    # the cached endpoint/secret may be stale
+    if 'db_discovery' in sys.modules:
+        sys.modules['db_discovery'].default_discovery().invalidate()
+
+def _select_cars(columns=None, keys=None, where=None, params=None, order_by=None):
+    """
+    SELECT the given columns (all when None) from cars, optionally only the (make, model, year) keys given
+    and/or rows matching a raw WHERE condition.
+    Returns None if there is no database or the query fails.
+    """
+    pd = _load('pandas')
+    engine = get_engine()
+    if engine is None:
+        return None
+
+    sqlalchemy = _load('sqlalchemy')
+    projection = ', '.join(f'"{col}"' for col in columns) if columns else '*'
+    query = f"SELECT {projection} FROM cars"
+    params = dict(params or {})
+    conditions = [where] if where else []
+    if keys is not None:
+        if not keys:
+            return pd.DataFrame(columns=columns)
+        clauses = []
+        for i, (make, model, year) in enumerate(keys):
+            clauses.append(f"(make = :make_{i} AND model = :model_{i} AND year = :year_{i})")
+            params.update({f'make_{i}': make, f'model_{i}': model, f'year_{i}': int(year)})
+        conditions.append("(" + " OR ".join(clauses) + ")")
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    if order_by:
+        query += f" ORDER BY {order_by}"
+    try:
+        with engine.connect() as conn:
+            return pd.read_sql(sqlalchemy.text(query), conn, params=params)
+    except Exception as e:
+        print(f"RDS Connection Failed: {e}")
+        reset_engine()
+        return None
+
+def catalog_db_version():
+    """
+    The catalog_meta version counter init_db bumps on every change, or None if the database has no change tracking.
+    """
+    engine = get_engine()
+    if engine is None:
+        return None
+    try:
+        with engine.connect() as conn:
+            return int(conn.execute(_load('sqlalchemy').text("SELECT version FROM catalog_meta")).scalar())
+    except Exception:
+        return None
+
+def load_changes(since, columns):
+    """Rows (including soft-deleted ones) changed after catalog version `since`, oldest first."""
+    return _select_cars(columns + ['deleted'], where="row_version > :since", params={'since': since}, order_by="row_version")
+
+def load_data(columns=CATALOG_COLUMNS, tracked=False):
+    """
+    Loads the catalog (only the given columns; None means every column), falling back to static data.
+    tracked=True skips soft-deleted rows (tables managed by init_db's change tracking).
+    Rows come back sorted by make/model/year so every load (and build_artifacts) sees the same row positions.
+    """
+    print("--- 🔍 DB LOAD INITIATED ---")
+    df = _select_cars(columns, where="NOT deleted" if tracked else None)
+    if df is not None:
+        print(f"SUCCESS: Loaded {len(df)} vehicles from RDS.")
+        return catalog_order(df)
+
+    print("Falling back to static static data.")
+    df = fallback_data()
+    if columns:
+        df = df[[col for col in columns if col in df.columns]]
+    return catalog_order(df)
+
+def catalog_order(df):
+    """
+    The catalog in make/model/year order. Sorted here rather than with ORDER BY so the order doesn't
+    depend on the database's collation (and heap order after updates never leaks into row positions).
+    """
+    if not set(KEY_COLUMNS).issubset(df.columns):
+        return df.reset_index(drop=True)
+    return df.sort_values(KEY_COLUMNS, kind='stable', ignore_index=True)
+
+def with_details(cars, columns=DETAIL_COLUMNS):
+    """
+    Returns the car rows with the given text columns joined back on by make/model/year (row order kept).
+    Small result sets only fetch their own rows; big ones read the whole column set once.
+    """
+    if cars.empty:
+        return cars
+    wanted = [col for col in columns if col not in cars.columns]
+    if not wanted:
+        return cars
+
+    keys = list(cars[KEY_COLUMNS].itertuples(index=False, name=None)) if len(cars) <= DETAIL_KEY_LIMIT else None
+    details = _select_cars(KEY_COLUMNS + wanted, keys=keys)
+    if details is None:
+        details = fallback_data()
+    wanted = [col for col in wanted if col in details.columns]
+    details = details[KEY_COLUMNS + wanted].drop_duplicates(KEY_COLUMNS).astype({'year': cars['year'].dtype})
+    merged = cars.merge(details, on=KEY_COLUMNS, how='left')
+    merged.index = cars.index
+    return merged
+
+def fallback_data():
     print("Returning fallback data...")
+    pd = _load('pandas')
     data = [
         {'make': 'Toyota', 'model': 'Prius', 'year': 2024, 'class': 'Sedan', 'price': 28000, 'city_mpg': 57, 'hwy_mpg': 56, 'fuel_type': 'Hybrid', 'reliability_score': 9.5, 'luxury_score': 5, 'features': 'Toyota Safety Sense 3.0', 'cargo_space': 20.3, 'rear_legroom': 34.8, 'acceleration': 7.2, 'driver_assist_score': 7, 'offroad_capability': 2, 'seats': 5},
         {'make': 'Honda', 'model': 'CR-V Hybrid', 'year': 2024, 'class': 'SUV', 'price': 34000, 'city_mpg': 43, 'hwy_mpg': 36, 'fuel_type': 'Hybrid', 'reliability_score': 9.0, 'luxury_score': 6, 'features': 'Honda Sensing', 'cargo_space': 39.3, 'rear_legroom': 41.0, 'acceleration': 7.6, 'driver_assist_score': 6, 'offroad_capability': 5, 'seats': 5},
@@ -87,15 +263,245 @@ def load_data():
 _model = None
 _preprocessor = None
 _df = None
+_feature_index = None
+_catalog_version = None
+# catalog_meta version the cache is synced to (None = untracked table or fallback data)
+_db_version = None
+
+# trained resale model (deprication model/train_model.py); without the artifact costs use the flat depreciation rate
+_resale_model = None
+_resale_model_checked = False
+
+def get_resale_model():
+    """
+    ResaleModel loaded once per container from resale_model's artifact path (RESALE_MODEL_ARTIFACT), or None.
+    resale_model only imports numpy once there is an artifact to load, so without one calculate stays numpy-free.
+    """
+    global _resale_model, _resale_model_checked
+    if not _resale_model_checked:
+        _resale_model_checked = True
+        with _timed("load resale model"):
+            _resale_model = _load('resale_model').ResaleModel.load()
+    return _resale_model
+
+def fit_model_assets(df):
+    """
+    Reuses the prebuilt artifact when it was fitted on this exact catalog, otherwise trains from scratch.
+    """
+    artifacts = _load('model_artifacts')
+    version = artifacts.catalog_version(df)
+    with _timed('artifact load'):
+        artifact = artifacts.load_artifact()
+    if artifact and artifact['version'] == version:
+        print(f"Using prebuilt recommender artifact (catalog version {version}).")
+        return artifact['model'], artifact['preprocessor'], version
+
+    print(f"No artifact for catalog version {version}. Training recommender...")
+    recommender = _load('car_recommender')
+    with _timed('model fit'):
+        model, preprocessor = recommender.train_recommender_model(df)
+    return model, preprocessor, version
+
+def load_catalog():
+    """
+    Returns (slim catalog DataFrame, FeatureIndex, catalog_meta version). The indexed text columns ride along
+    in the same query only long enough to build the bitmaps; links and other detail text are never loaded here.
+    """
+    feature_index = _load('feature_index')
+    # read the version first: anything written during the load is picked up again by the next refresh
+    db_version = catalog_db_version()
+    with _timed('db load'):
+        df = load_data(CATALOG_COLUMNS + feature_index.INDEXED_COLUMNS, tracked=db_version is not None)
+    with _timed('feature index'):
+        index = feature_index.FeatureIndex.from_frame(df)
+    return df[[col for col in CATALOG_COLUMNS if col in df.columns]], index, db_version
 
 def get_model_assets():
-    global _model, _preprocessor, _df
+    global _model, _preprocessor, _df, _feature_index, _catalog_version, _db_version
     if _model is None:
-        _df = load_data()
-        _model, _preprocessor = train_recommender_model(_df)
+        _df, _feature_index, _db_version = load_catalog()
+        _model, _preprocessor, _catalog_version = fit_model_assets(_df)
     return _df, _model, _preprocessor
 
+def refresh_catalog():
+    """
+    Brings the cached catalog up to date and returns a status message.
+    With change tracking only the rows changed since the last sync are pulled and patched in;
+    otherwise the whole catalog is reloaded.
+    """
+    global _model, _preprocessor, _df, _feature_index, _catalog_version, _db_version
+    if _model is not None and _db_version is not None:
+        db_version = catalog_db_version()
+        if db_version == _db_version:
+            return f"Catalog unchanged (db version {db_version}). {len(_df)} cars cached."
+        if db_version is not None:
+            with _timed('db load'):
+                changes = load_changes(_db_version, CATALOG_COLUMNS + _load('feature_index').INDEXED_COLUMNS)
+            if changes is not None:
+                return apply_catalog_changes(changes, db_version)
+
+    df, _feature_index, _db_version = load_catalog()
+    version = _load('model_artifacts').catalog_version(df)
+    if _model is not None and version == _catalog_version:
+        # same catalog, keep the fitted model
+        _df = df
+        return f"Catalog unchanged (version {version}). Loaded {len(df)} cars."
+    _model, _preprocessor, _catalog_version = fit_model_assets(df)
+    _df = df
+    return f"Cache refreshed. Loaded {len(df)} cars (version {version})."
+
+def apply_catalog_changes(changes, db_version):
+    """Patches the cached catalog, feature index and feature matrix with the changed rows."""
+    global _model, _preprocessor, _df, _feature_index, _catalog_version, _db_version
+    recommender = _load('car_recommender')
+    with _timed('catalog patch'):
+        delta = _load('catalog_delta').diff_catalog(_df, changes, _feature_index.position)
+        _feature_index.apply_delta(delta)
+        _model, _preprocessor, refit = recommender.update_recommender(_model, _preprocessor, delta)
+    _df = delta.frame
+    # no full-catalog content hash here; the db counter identifies the patched catalog
+    _catalog_version = f"db-{db_version}"
+    _db_version = db_version
+    removed = int((~delta.keep).sum())
+    refit_note = " Scaler drifted, model refit." if refit else ""
+    return (f"Applied {len(changes)} changed rows: {len(delta.updated)} updated, {len(delta.appended)} new, "
+            f"{removed} removed.{refit_note} {len(_df)} cars (db version {db_version}).")
+
+MAX_PAGE_SIZE = 2000
+# catalog positions sorted by make/model/year, for keyset pagination (rebuilt when the catalog version changes)
+_listing = {'version': None, 'order': None, 'keys': None}
+
+def _listing_order(df):
+    car_key = _load('feature_index').car_key
+    if _listing['version'] != _catalog_version or _listing['order'] is None or len(_listing['order']) != len(df):
+        keys = [car_key(row) for row in df[KEY_COLUMNS].to_dict(orient='records')]
+        order = sorted(range(len(keys)), key=keys.__getitem__)
+        _listing.update({'version': _catalog_version, 'order': order, 'keys': [keys[i] for i in order]})
+    return _listing['order'], _listing['keys']
+
+def _encode_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode('utf-8')).decode('ascii')
+
+def _decode_cursor(cursor):
+    try:
+        make, model, year = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+    return _load('feature_index').car_key({'make': make, 'model': model, 'year': year})
+
+def list_cars(df, body):
+    """
+    get_all_cars. Optional request fields:
+      fields   columns to return (make/model/year always included; detail text is joined only if asked for)
+      filters  same hard filters as recommend (fuel_types, max_price, class, min_seats, features)
+      keys     [{make, model, year}, ...] to fetch specific cars
+      limit / cursor   keyset pagination in make/model/year order; the response becomes
+                       {'cars': ..., 'next_cursor': ..., 'total': ...}
+      format   'columnar' for to_columnar output instead of records
+    """
+    np = _load('numpy')
+    mask = _load('car_recommender').build_constraint_mask(df, body.get('filters'), _feature_index)
+    if body.get('keys') is not None:
+        wanted = np.zeros(len(df), dtype=bool)
+        for car in body['keys']:
+            pos = _feature_index.position(car)
+            if pos is not None:
+                wanted[pos] = True
+        mask &= wanted
+
+    paged = 'limit' in body or 'cursor' in body
+    if paged:
+        order, sorted_keys = _listing_order(df)
+        start = 0
+        if body.get('cursor'):
+            start = bisect.bisect_right(sorted_keys, _decode_cursor(body['cursor']))
+        order = np.asarray(order[start:], dtype=int)
+        matching = order[mask[order]]
+        limit = max(1, min(int(body.get('limit') or MAX_PAGE_SIZE), MAX_PAGE_SIZE))
+        positions = matching[:limit]
+        next_cursor = None
+        if len(matching) > limit:
+            next_cursor = _encode_cursor(_load('feature_index').car_key(df.iloc[positions[-1]]))
+    else:
+        positions = np.flatnonzero(mask)
+    cars = df.iloc[positions]
+
+    fields = body.get('fields')
+    if fields:
+        columns = list(dict.fromkeys(KEY_COLUMNS + [col for col in fields if col in cars.columns]))
+        details = [col for col in fields if col in DETAIL_COLUMNS and col not in columns]
+        cars = with_details(cars[columns], columns=details) if details else cars[columns]
+    else:
+        cars = with_details(cars)
+
+    payload = to_columnar(cars) if body.get('format') == 'columnar' else cars.to_dict(orient='records')
+    if not paged:
+        return payload
+    return {'cars': payload, 'next_cursor': next_cursor, 'total': int(mask.sum())}
+
+# responses smaller than this aren't worth the gzip + base64 overhead
+GZIP_MIN_BYTES = 1024
+
+def _accepts_gzip(event):
+    headers = event.get('headers') or {}
+    accept = next((v for k, v in headers.items() if k.lower() == 'accept-encoding'), '')
+    return 'gzip' in (accept or '')
+
+def _ok(response_body, gzip_ok=False):
+    headers = {
+        'Content-Type': 'application/json',
+        'Access-Control-Allow-Origin': '*'
+    }
+    if gzip_ok and len(response_body) >= GZIP_MIN_BYTES:
+        # HTTP API (payload v2) decodes the base64 body and passes the gzip bytes through untouched
+        import gzip
+        headers['Content-Encoding'] = 'gzip'
+        compressed = gzip.compress(response_body.encode('utf-8'), compresslevel=6)
+        return {
+            'statusCode': 200,
+            'headers': headers,
+            'body': base64.b64encode(compressed).decode('ascii'),
+            'isBase64Encoded': True
+        }
+    return {
+        'statusCode': 200,
+        'headers': headers,
+        'body': response_body
+    }
+
+def to_columnar(df):
+    """
+    Column-oriented payload: names once, one value list per column, and the dtypes to rebuild a typed frame.
+    Missing values go out as null.
+    """
+    data = {}
+    for col in df.columns:
+        values = df[col]
+        if values.isna().any():
+            values = values.astype(object).where(values.notna(), None)
+        data[col] = values.tolist()
+    return {
+        'format': 'columnar',
+        'columns': list(df.columns),
+        'dtypes': {col: str(dtype) for col, dtype in df.dtypes.items()},
+        'data': data
+    }
+
+def score_car(car_data, inputs, include_curve=False):
+    """calculate_tco, plus the month-by-month cost curve under 'curve' when asked for."""
+    costs = calculate_tco(car_data, inputs, resale_model=get_resale_model())
+    if include_curve:
+        costs['curve'] = calculate_cost_curve(car_data, inputs, resale_model=get_resale_model())
+    return costs
+
+def pitch_stream_lines(car_data, priority):
+    """NDJSON lines for pitch_stream: {"delta": text} per chunk, then {"done": true}."""
+    for text in _load('ai_advisor').stream_car_pitch(car_data, priority):
+        yield json.dumps({'delta': text}) + '\n'
+    yield json.dumps({'done': True}) + '\n'
+
 def lambda_handler(event, context):
+    action = None
     try:
         if 'body' in event:
             if isinstance(event['body'], str):
@@ -113,55 +519,151 @@ def lambda_handler(event, context):
         
         result = {}
 
+        cache_key = None
+        if action in CACHED_ACTIONS:
+            # calculate is a pure function of the request; recommend also depends on the loaded catalog
+            version = None
+            if action == 'recommend':
+                get_model_assets()
+                version = _catalog_version
+            cache_key = request_key(body, version)
+            cached = _response_cache.get(cache_key)
+            print(json.dumps({'event': 'response_cache', 'action': action, 'hit': cached is not None, **_response_cache.stats()}))
+            if cached is not None:
+                return _ok(cached, _accepts_gzip(event))
+
         if action == 'refresh':
             print("Processing Refresh Request...")
-            global _model, _preprocessor, _df
-            _model = None
-            _preprocessor = None
-            _df = None
-            df, model, preprocessor = get_model_assets()
-            result = {"status": "success", "message": f"Cache refreshed. Loaded {len(df)} cars."}
+            result = {"status": "success", "message": refresh_catalog()}
+            _response_cache.clear()
+
+        elif action == 'cache_stats':
+            result = _response_cache.stats()
 
         elif action == 'recommend':
             print("Processing Recommendation Request...")
             df, model, preprocessor = get_model_assets()
-            recommendations_df = get_recommendations(inputs, df, model, preprocessor)
-            result = recommendations_df.to_dict(orient='records')
+            recommender = _load('car_recommender')
+            constraints = body.get('filters', {})
+            top_k = body.get('top_k', recommender.DEFAULT_TOP_K)
+            weights = recommender.priority_weights(inputs.get('priority'))
+            
+            if body.get('rank_by') == 'true_cost':
+                # price every surviving candidate here so the cheapest car to own can't be cut before it is costed
+                recommendations_df = recommender.get_recommendations(inputs, df, model, preprocessor, constraints=constraints, top_k=None, feature_index=_feature_index, weights=weights)
+                recommendations_df = _load('vector_calculator').rank_by_true_cost(recommendations_df, body.get('tco_inputs', {}), top_k=top_k, resale_model=get_resale_model())
+            else:
+                recommendations_df = recommender.get_recommendations(inputs, df, model, preprocessor, constraints=constraints, top_k=top_k, feature_index=_feature_index, weights=weights)
+            result = with_details(recommendations_df).to_dict(orient='records')
             
         elif action == 'get_all_cars':
             print("Processing Get All Cars Request...")
             df, model, preprocessor = get_model_assets()
-            result = df.to_dict(orient='records')
+            try:
+                result = list_cars(df, body)
+            except ValueError as e:
+                return {'statusCode': 400, 'body': json.dumps({'error': str(e)})}
 
         elif action == 'calculate':
             print("Processing Calculation Request...")
             if not car_data:
                 return {'statusCode': 400, 'body': json.dumps({'error': 'Missing car_data'})}
-            result = calculate_tco(car_data, inputs, resale_model=None)
+            result = score_car(car_data, inputs, body.get('include_curve'))
+
+        elif action == 'calculate_batch':
+            print("Processing Batch Calculation Request...")
+            cars = body.get('cars', [])
+            inputs_list = body.get('inputs_list') or [inputs]
+            if not cars:
+                return {'statusCode': 400, 'body': json.dumps({'error': 'Missing cars'})}
+            # grid of results, one row per car and one column per inputs variant
+            result = {
+                'results': [
+                    [score_car(car, variant, body.get('include_curve')) for variant in inputs_list]
+                    for car in cars
+                ]
+            }
+
+        elif action == 'calculate_distribution':
+            print("Processing Distribution Request...")
+            if not car_data:
+                return {'statusCode': 400, 'body': json.dumps({'error': 'Missing car_data'})}
+            scenarios = _load('scenario_calculator')
+            try:
+                result = scenarios.calculate_distribution(
+                    car_data, inputs,
+                    samples=body.get('samples', scenarios.DEFAULT_SAMPLES),
+                    uncertainty=body.get('uncertainty'),
+                    seed=body.get('seed', 0),
+                    resale_model=get_resale_model()
+                )
+            except ValueError as e:
+                return {'statusCode': 400, 'body': json.dumps({'error': str(e)})}
+
+        elif action == 'sweep':
+            print("Processing Sweep Request...")
+            cars = body.get('cars', [])
+            if not cars or not body.get('axes'):
+                return {'statusCode': 400, 'body': json.dumps({'error': 'Missing cars or axes'})}
+            try:
+                result = _load('scenario_calculator').sweep(
+                    cars, inputs, body['axes'],
+                    metric=body.get('metric', 'Monthly True Cost'),
+                    resale_model=get_resale_model()
+                )
+            except ValueError as e:
+                return {'statusCode': 400, 'body': json.dumps({'error': str(e)})}
+
+        elif action == 'optimize_deal':
+            print("Processing Deal Optimization Request...")
+            if not car_data:
+                return {'statusCode': 400, 'body': json.dumps({'error': 'Missing car_data'})}
+            scenarios = _load('scenario_calculator')
+            try:
+                result = scenarios.optimize_deal(
+                    car_data, inputs,
+                    max_upfront=body.get('max_upfront'),
+                    finance_terms=body.get('finance_terms', scenarios.FINANCE_TERMS),
+                    lease_terms=body.get('lease_terms', scenarios.LEASE_TERMS),
+                    upfront_step=body.get('upfront_step', scenarios.DEFAULT_UPFRONT_STEP),
+                    resale_model=get_resale_model()
+                )
+            except ValueError as e:
+                return {'statusCode': 400, 'body': json.dumps({'error': str(e)})}
 
         elif action == 'pitch':
             print("Processing Pitch Request...")
             if not car_data:
                 return {'statusCode': 400, 'body': json.dumps({'error': 'Missing car_data'})}
             priority = inputs.get('priority', 'Balanced')
-            pitch_text = get_car_pitch(car_data, priority)
+            pitch_text = _load('ai_advisor').get_car_pitch(car_data, priority)
             result = {'pitch': pitch_text}
 
+        elif action == 'pitch_stream':
+            print("Processing Streaming Pitch Request...")
+            if not car_data:
+                return {'statusCode': 400, 'body': json.dumps({'error': 'Missing car_data'})}
+            priority = inputs.get('priority', 'Balanced')
+            # the managed Python runtime buffers this body; the NDJSON framing is what a streaming host would flush line by line
+            return {
+                'statusCode': 200,
+                'headers': {'Content-Type': 'application/x-ndjson'},
+                'body': ''.join(pitch_stream_lines(car_data, priority))
+            }
+
         else:
             return {'statusCode': 400, 'body': json.dumps({'error': f'Unknown action: {action}'})}
 
-        return {
-            'statusCode': 200,
-            'headers': {
-                'Content-Type': 'application/json',
-                'Access-Control-Allow-Origin': '*'
-            },
-            'body': json.dumps(result)
-        }
+        response_body = json.dumps(result)
+        if cache_key is not None:
+            _response_cache.put(cache_key, response_body)
+        return _ok(response_body, _accepts_gzip(event))
         
     except Exception as e:
         print(f"Fatal Lambda Error: {e}")
         return {
             'statusCode': 500,
             'body': json.dumps({'error': str(e)})
-        }
\ No newline at end of file
+        }
+    finally:
+        _emit_init_report(action)
\ No newline at end of file
@@ -0,0 +1,67 @@
+import os
+import io
+import hashlib
+import numpy as np
+import pandas as pd
+from car_recommender import NearestCars, Preprocessor
+
+# bump when the artifact layout changes so old files are ignored instead of half-loaded
+ARTIFACT_FORMAT = 2
+DEFAULT_ARTIFACT_PATH = os.environ.get(
+    'RECOMMENDER_ARTIFACT',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'artifacts', 'recommender.npz')
+)
+
+def catalog_version(df):
+    """
+    Content hash of the catalog, rows in their actual order: the feature matrix and neighbor positions are
+    row positions, so the same cars in another order are a different catalog.
+    Same rows, values and order -> same version, regardless of where they were loaded from.
+    """
+    row_hashes = pd.util.hash_pandas_object(df[sorted(df.columns)], index=False).to_numpy()
+    return hashlib.sha256(row_hashes.tobytes()).hexdigest()[:16]
+
+def save_artifact(df, model, preprocessor, path=DEFAULT_ARTIFACT_PATH):
+    """
+    Writes the fitted scaler stats, category vocabularies, feature matrix and the catalog snapshot
+    they were fitted on to one npz file (no pickles).
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    version = catalog_version(df)
+    arrays = {
+        'format': np.array(ARTIFACT_FORMAT),
+        'version': np.array(version),
+        'means': preprocessor.means,
+        'scales': preprocessor.scales,
+        'X': model.X,
+        'catalog': np.array(df.to_json(orient='split'))
+    }
+    for i, vocab in enumerate(preprocessor.vocabularies):
+        arrays[f'vocab_{i}'] = vocab.astype(str)
+    with open(path, 'wb') as f:
+        np.savez(f, **arrays)
+    return version
+
+def load_artifact(path=DEFAULT_ARTIFACT_PATH):
+    """
+    Returns {'version', 'model', 'preprocessor', 'catalog'} or None if the file is missing, unreadable or from another format.
+    The catalog snapshot is only parsed when asked for.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        data = np.load(path, allow_pickle=False)
+        if int(data['format']) != ARTIFACT_FORMAT:
+            print(f"Ignoring recommender artifact with format {int(data['format'])} (expected {ARTIFACT_FORMAT}).")
+            return None
+        vocab_keys = sorted((k for k in data.files if k.startswith('vocab_')), key=lambda k: int(k.split('_')[1]))
+        preprocessor = Preprocessor(data['means'], data['scales'], [data[k] for k in vocab_keys])
+        return {
+            'version': str(data['version']),
+            'model': NearestCars(data['X']),
+            'preprocessor': preprocessor,
+            'catalog': lambda: pd.read_json(io.StringIO(str(data['catalog'])), orient='split')
+        }
+    except Exception as e:
+        print(f"Could not load recommender artifact '{path}': {e}")
+        return None
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_TTL = 7 * 24 * 3600
+
+class PitchCache:
+    """
+    LRU of generated pitches with a TTL, in front of an optional persistent store
+    (SqliteStore or DynamoStore) so pitches survive cold starts and are shared across containers.
+    Memory misses fall through to the store and are promoted on a hit.
+    """
+    def __init__(self, max_entries=256, ttl=DEFAULT_TTL, store=None, clock=time.time):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.store = store
+        self._clock = clock
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.store_hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        now = self._clock()
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] > now:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+        self._entries.pop(key, None)
+
+        item = self._store_get(key)
+        if item is not None and item['expires_at'] > now:
+            self._remember(key, item['pitch'], item['expires_at'])
+            self.store_hits += 1
+            return item['pitch']
+
+        self.misses += 1
+        return None
+
+    def put(self, key, pitch):
+        expires_at = int(self._clock() + self.ttl)
+        self._remember(key, pitch, expires_at)
+        if self.store is not None:
+            try:
+                self.store.put_item({'pitch_key': key, 'pitch': pitch, 'expires_at': expires_at})
+            except Exception as e:
+                print(f"Pitch cache store write failed: {e}")
+
+    def _remember(self, key, pitch, expires_at):
+        self._entries[key] = (pitch, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _store_get(self, key):
+        if self.store is None:
+            return None
+        try:
+            return self.store.get_item(key)
+        except Exception as e:
+            # a flaky store only costs a regenerated pitch
+            print(f"Pitch cache store read failed: {e}")
+            return None
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.store_hits + self.misses
+        return {
+            'hits': self.hits,
+            'store_hits': self.store_hits,
+            'misses': self.misses,
+            'hit_rate': round((self.hits + self.store_hits) / lookups, 3) if lookups else 0.0,
+            'size': len(self._entries),
+            'store': type(self.store).__name__ if self.store is not None else None
+        }
+
+class SqliteStore:
+    """Local persistent store: one table, items as {'pitch_key', 'pitch', 'expires_at'}."""
+    def __init__(self, path):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS pitch_cache (pitch_key TEXT PRIMARY KEY, pitch TEXT NOT NULL, expires_at INTEGER NOT NULL)"
+            )
+
+    def get_item(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT pitch, expires_at FROM pitch_cache WHERE pitch_key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        return {'pitch_key': key, 'pitch': row[0], 'expires_at': row[1]}
+
+    def put_item(self, item):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pitch_cache (pitch_key, pitch, expires_at) VALUES (?, ?, ?)",
+                (item['pitch_key'], item['pitch'], int(item['expires_at']))
+            )
+
+class DynamoStore:
+    """
+    DynamoDB table with a 'pitch_key' string hash key. expires_at doubles as the table's TTL attribute,
+    so DynamoDB removes expired pitches itself (its sweep lags, hence the expiry check in PitchCache).
+    """
+    def __init__(self, table_name, client):
+        self.table_name = table_name
+        self._client = client
+
+    def get_item(self, key):
+        item = self._client.get_item(TableName=self.table_name, Key={'pitch_key': {'S': key}}).get('Item')
+        if item is None:
+            return None
+        return {'pitch_key': key, 'pitch': item['pitch']['S'], 'expires_at': int(item['expires_at']['N'])}
+
+    def put_item(self, item):
+        self._client.put_item(TableName=self.table_name, Item={
+            'pitch_key': {'S': item['pitch_key']},
+            'pitch': {'S': item['pitch']},
+            'expires_at': {'N': str(int(item['expires_at']))}
+        })
+
+def template_hash(*parts):
+    """Short hash of the prompt template and model settings; editing either starts a fresh set of keys."""
+    payload = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:12]
+
+def pitch_key(car_id, priority, prompt_hash):
+    """Cache key for one (car, priority) pitch under one prompt version."""
+    payload = json.dumps([list(car_id), priority, prompt_hash], separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def default_store(client_factory=None):
+    """
+    Persistent store from the environment: PITCH_CACHE_TABLE (DynamoDB) or PITCH_CACHE_DB (SQLite path).
+    None when neither is set.
+    """
+    table_name = os.environ.get('PITCH_CACHE_TABLE')
+    if table_name:
+        if client_factory is None:
+            import boto3
+            client_factory = lambda: boto3.client('dynamodb', region_name=os.environ.get('AWS_REGION', 'us-east-1'))
+        return DynamoStore(table_name, client_factory())
+    path = os.environ.get('PITCH_CACHE_DB')
+    if path:
+        return SqliteStore(path)
+    return None
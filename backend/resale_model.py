@@ -0,0 +1,148 @@
+import json
+import os
+
+# numpy is imported inside the functions that use it, so the Lambda can look for (and skip) a missing
+# artifact without putting numpy on the calculate path
+# bump when the coefficient layout changes so old files are ignored instead of misread
+ARTIFACT_FORMAT = 1
+DEFAULT_ARTIFACT_PATH = os.environ.get(
+    'RESALE_MODEL_ARTIFACT',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'artifacts', 'resale_model.json')
+)
+
+# car attributes the retention rate depends on (defaults match cost_calculator's)
+FEATURES = ['intercept', 'luxury_score', 'reliability_score', 'is_electric', 'is_hybrid']
+FEATURE_DEFAULTS = {'luxury_score': 5, 'reliability_score': 5}
+# how age enters: a steady yearly rate plus a front-loaded sqrt term for the early drop
+AGE_TERMS = ['age', 'sqrt_age']
+
+# keep predictions sane for cars/horizons far outside the training data
+MIN_RETENTION = 0.02
+
+class ResaleModel:
+    """
+    Log-linear retention model: log(resale / new price) = sum over age terms and features of coef * age_term(years) * feature.
+    Every term is zero at age 0, so a new car is worth its price.
+    coef has one row per AGE_TERMS entry and one column per FEATURES entry.
+    """
+    def __init__(self, coef, trained_rows=0, rmse=None):
+        import numpy as np
+        self.coef = np.asarray(coef, dtype=float)
+        self.trained_rows = trained_rows
+        self.rmse = rmse
+
+    @classmethod
+    def fit(cls, listings):
+        """
+        Least-squares fit on historical listings (DataFrame or dict of columns) with
+        msrp, price (the listing price) and age_years, plus the car attributes in FEATURES
+        (missing ones take their defaults). Rows with a non-positive msrp or price are dropped.
+        """
+        import numpy as np
+        msrp = np.asarray(listings['msrp'], dtype=float)
+        price = np.asarray(listings['price'], dtype=float)
+        age = np.asarray(listings['age_years'], dtype=float)
+        valid = (msrp > 0) & (price > 0) & (age >= 0) & np.isfinite(msrp + price + age)
+        if not valid.any():
+            raise ValueError("No usable listings (need positive msrp and price and a non-negative age_years).")
+
+        features = _feature_matrix(listings)[valid]
+        terms = _age_terms(age[valid])
+        # one design column per (age term, feature) pair
+        design = (terms[:, :, None] * features[:, None, :]).reshape(valid.sum(), -1)
+        target = np.log(price[valid] / msrp[valid])
+        solution, _, _, _ = np.linalg.lstsq(design, target, rcond=None)
+        rmse = float(np.sqrt(np.mean((design @ solution - target) ** 2)))
+        return cls(solution.reshape(len(AGE_TERMS), len(FEATURES)), trained_rows=int(valid.sum()), rmse=rmse)
+
+    def retention_many(self, cars, years_array):
+        """Share of the new price kept, shape (number of cars, number of horizons)."""
+        import numpy as np
+        features = _feature_matrix(cars)
+        terms = _age_terms(np.atleast_1d(np.asarray(years_array, dtype=float)))
+        log_retention = np.zeros((len(features), len(terms)))
+        # elementwise on purpose: one car scores the same whether it is alone or in the whole catalog
+        for a in range(len(AGE_TERMS)):
+            rate = np.zeros(len(features))
+            for f in range(len(FEATURES)):
+                rate = rate + features[:, f] * self.coef[a, f]
+            log_retention = log_retention + rate[:, None] * terms[None, :, a]
+        return np.clip(np.exp(log_retention), MIN_RETENTION, 1.0)
+
+    def predict_future_value_many(self, cars, years_array):
+        """Resale value of every car (DataFrame, dict of columns or list of rows) at every horizon in years_array, in one pass."""
+        price = _column(cars, 'price', 30000)
+        return price[:, None] * self.retention_many(cars, years_array)
+
+    def predict_future_value(self, car_row, years):
+        """The cost_calculator resale_model hook: value of one car after `years`."""
+        return float(self.predict_future_value_many([dict(car_row)], [years])[0, 0])
+
+    def save(self, path=DEFAULT_ARTIFACT_PATH):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        artifact = {
+            'format': ARTIFACT_FORMAT,
+            'features': FEATURES,
+            'age_terms': AGE_TERMS,
+            'coef': self.coef.tolist(),
+            'trained_rows': self.trained_rows,
+            'rmse': self.rmse
+        }
+        with open(path, 'w') as f:
+            json.dump(artifact, f, indent=2)
+
+    @classmethod
+    def load(cls, path=DEFAULT_ARTIFACT_PATH):
+        """The saved model, or None if the file is missing, unreadable or from another layout."""
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path) as f:
+                artifact = json.load(f)
+            if artifact.get('format') != ARTIFACT_FORMAT or artifact.get('features') != FEATURES or artifact.get('age_terms') != AGE_TERMS:
+                print(f"Ignoring resale model artifact '{path}' with a different layout.")
+                return None
+            return cls(artifact['coef'], artifact.get('trained_rows', 0), artifact.get('rmse'))
+        except Exception as e:
+            print(f"Could not load resale model artifact '{path}': {e}")
+            return None
+
+def _age_terms(age):
+    import numpy as np
+    age = np.maximum(np.asarray(age, dtype=float), 0.0)
+    return np.stack([age, np.sqrt(age)], axis=-1)
+
+def _rows_or_columns(cars):
+    """Column access for a DataFrame, a dict of columns or a list of row dicts."""
+    if isinstance(cars, list):
+        keys = set().union(*(row.keys() for row in cars))
+        return {key: [row.get(key) for row in cars] for key in keys}
+    return cars
+
+def _column(cars, name, default):
+    import numpy as np
+    cars = _rows_or_columns(cars)
+    if name in cars:
+        # float conversion turns None into NaN, so one np.where fills both
+        values = np.asarray(cars[name], dtype=float)
+        return np.where(np.isnan(values), float(default), values)
+    return np.full(_num_rows(cars), float(default))
+
+def _num_rows(cars):
+    if hasattr(cars, 'index'):
+        return len(cars.index)
+    return len(next(iter(cars.values()))) if cars else 0
+
+def _feature_matrix(cars):
+    import numpy as np
+    cars = _rows_or_columns(cars)
+    n = _num_rows(cars)
+    fuel_type = np.asarray(cars['fuel_type'], dtype=object) if 'fuel_type' in cars else np.full(n, None, dtype=object)
+    columns = {
+        'intercept': np.ones(n),
+        'luxury_score': _column(cars, 'luxury_score', FEATURE_DEFAULTS['luxury_score']),
+        'reliability_score': _column(cars, 'reliability_score', FEATURE_DEFAULTS['reliability_score']),
+        'is_electric': (fuel_type == 'Electric').astype(float),
+        'is_hybrid': (fuel_type == 'Hybrid').astype(float)
+    }
+    return np.column_stack([columns[name] for name in FEATURES])
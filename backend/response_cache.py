@@ -0,0 +1,57 @@
+import json
+import hashlib
+from collections import OrderedDict
+
+class ResponseCache:
+    """
+    Size-bounded LRU of serialized response bodies keyed by a canonical request hash.
+    Pure Python so the calculate path stays free of pandas/numpy.
+    """
+    def __init__(self, max_entries=512):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        body = self._entries.get(key)
+        if body is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return body
+
+    def put(self, key, body):
+        self._entries[key] = body
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+            'size': len(self._entries),
+            'max_entries': self.max_entries
+        }
+
+def _canonical(value):
+    # 30000 and 30000.0 (and "a" vs keys in another order) should hash the same
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def request_key(body, catalog_version=None):
+    """sha256 of the request body (action, car, inputs, filters...) plus the catalog version it was answered against."""
+    payload = json.dumps([_canonical(body), catalog_version], sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
@@ -0,0 +1,314 @@
+import numpy as np
+from cost_calculator import _predict_value
+from financial_engine import calculate_lease_payments
+from vector_calculator import CAR_DEFAULTS, _monthly_costs
+
+DEFAULT_SAMPLES = 5000
+# fewer samples than this and p10/p90 are mostly noise
+MIN_SAMPLES = 100
+MAX_SAMPLES = 20000
+PERCENTILES = (10, 50, 90)
+
+# spread of each uncertain input around the user's value:
+# prices and mileage are lognormal (median = the entered value), resale is a normal multiplier
+DEFAULT_UNCERTAINTY = {
+    'gas_price': 0.15,
+    'elec_price': 0.10,
+    'mileage': 0.15,
+    'resale': 0.10
+}
+
+def _mileage_inputs(inputs, scale):
+    """Inputs with every driving distance multiplied by scale (array), whichever mileage mode they use."""
+    scaled = dict(inputs)
+    if 'commute_dist' in inputs:
+        for key, default in (('commute_dist', 20), ('road_trip_miles', 1000), ('other_miles', 50)):
+            scaled[key] = inputs.get(key, default) * scale
+    else:
+        scaled['annual_miles'] = inputs.get('annual_miles', 12000) * scale
+    return scaled
+
+def _number(value, name):
+    """value as a finite float (numeric strings included), or ValueError naming the field."""
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a number.")
+    if not np.isfinite(number):
+        raise ValueError(f"{name} must be a number.")
+    return number
+
+def _summary(values):
+    p10, p50, p90 = np.percentile(values, PERCENTILES)
+    return {'p10': round(float(p10), 2), 'p50': round(float(p50), 2), 'p90': round(float(p90), 2), 'mean': round(float(values.mean()), 2)}
+
+def calculate_distribution(car_row, inputs, samples=DEFAULT_SAMPLES, uncertainty=None, seed=0, resale_model=None):
+    """
+    Monte Carlo over gas price, electricity price, annual mileage and resale value for one car.
+    All samples go through the vectorized TCO math as one broadcast pass (no loop over samples).
+    A fixed seed keeps the answer stable for the same request. Returns p10/p50/p90/mean of
+    Monthly True Cost, Monthly Cash Flow and Total Cost over the analysis horizon.
+    Raises ValueError for a non-numeric seed, samples outside MIN_SAMPLES..MAX_SAMPLES
+    or an unknown or negative uncertainty.
+    """
+    samples = int(_number(samples, 'samples'))
+    if not MIN_SAMPLES <= samples <= MAX_SAMPLES:
+        raise ValueError(f"samples must be between {MIN_SAMPLES} and {MAX_SAMPLES}.")
+    seed = int(_number(seed, 'seed'))
+    spread = dict(DEFAULT_UNCERTAINTY)
+    if uncertainty is not None and not isinstance(uncertainty, dict):
+        raise ValueError("uncertainty must map input names to spreads.")
+    for name, sigma in (uncertainty or {}).items():
+        if name not in DEFAULT_UNCERTAINTY:
+            raise ValueError(f"Unknown uncertainty '{name}' (expected one of: {', '.join(DEFAULT_UNCERTAINTY)}).")
+        spread[name] = _number(sigma, f"uncertainty '{name}'")
+        if spread[name] < 0:
+            raise ValueError(f"uncertainty '{name}' can't be negative.")
+    rng = np.random.default_rng(seed)
+
+    gas_factor = np.exp(rng.normal(0.0, spread['gas_price'], samples))
+    elec_factor = np.exp(rng.normal(0.0, spread['elec_price'], samples))
+    mileage_factor = np.exp(rng.normal(0.0, spread['mileage'], samples))
+    resale_factor = np.clip(rng.normal(1.0, spread['resale'], samples), 0.0, None)
+
+    scenario = _mileage_inputs(inputs, mileage_factor)
+    scenario['gas_price'] = inputs.get('gas_price', 3.50) * gas_factor
+    # home and road charging move together
+    scenario['elec_price'] = inputs.get('elec_price', 0.16) * elec_factor
+    scenario['elec_price_road'] = inputs.get('elec_price_road', 0.36) * elec_factor
+
+    car = {key: [value] for key, value in dict(car_row).items()}
+    costs = _monthly_costs(car, scenario, resale_model)
+    m_tco = np.broadcast_to(costs['m_tco'], (samples,))
+    m_cash_flow = np.broadcast_to(costs['m_cash_flow'], (samples,))
+
+    years = costs['years']
+    if costs['buying_method'] in ('Cash', 'Finance'):
+        # a resale value off by some factor moves the depreciation spread over the horizon
+        m_tco = m_tco + (1.0 - resale_factor) * costs['future_val'] / (years * 12)
+
+    horizon_months = years * 12
+    return {
+        'samples': samples,
+        'horizon_months': horizon_months,
+        'Monthly True Cost': _summary(m_tco),
+        'Monthly Cash Flow': _summary(m_cash_flow),
+        'Total Cost': _summary(m_tco * horizon_months)
+    }
+
+# inputs a sweep can vary: the ones _get_mileage_and_efficiency and _calculate_operational_costs read,
+# plus annual_miles (switches to the flat-mileage mode) and mileage_scale (scales every driving distance)
+SWEEP_AXES = {
+    'gas_price', 'elec_price', 'elec_price_road', 'commute_dist', 'days_week', 'road_trip_miles',
+    'other_miles', 'driver_age', 'custom_insurance', 'annual_miles', 'mileage_scale'
+}
+SWEEP_METRICS = {'Monthly True Cost': 'm_tco', 'Monthly Cash Flow': 'm_cash_flow'}
+MAX_SWEEP_CARS = 20
+MAX_AXIS_POINTS = 200
+
+def _axis_values(axis):
+    """Grid points of one axis: its 'values', or 'steps' (default 25) points from 'start' to 'stop'. ValueError if neither is usable."""
+    name = axis.get('name')
+    if 'values' not in axis and not ('start' in axis and 'stop' in axis):
+        raise ValueError(f"Axis '{name}' needs 'values' or 'start' and 'stop'.")
+    try:
+        if 'values' in axis:
+            values = np.asarray(axis['values'], dtype=float)
+        else:
+            values = np.linspace(float(axis['start']), float(axis['stop']), max(int(axis.get('steps', 25)), 0))
+    except (TypeError, ValueError):
+        raise ValueError(f"Axis '{name}' values, start, stop and steps must be numbers.")
+    if values.ndim != 1 or not 1 <= len(values) <= MAX_AXIS_POINTS or not np.isfinite(values).all():
+        raise ValueError(f"Axis '{name}' needs 1 to {MAX_AXIS_POINTS} finite values.")
+    return values
+
+def _crossings(diff, values, axis):
+    """
+    Where diff (a car-minus-car surface) changes sign along one grid axis, linearly interpolated.
+    Returns (positions along that axis, indices of the other axis) for every crossing.
+    """
+    if diff.ndim == 1:
+        diff = diff[:, None]
+    if axis == 1:
+        diff = diff.T
+    lo, hi = diff[:-1], diff[1:]
+    found = ((lo < 0) & (hi >= 0)) | ((lo > 0) & (hi <= 0))
+    rows, cols = np.nonzero(found)
+    fraction = lo[rows, cols] / (lo[rows, cols] - hi[rows, cols])
+    return values[rows] + fraction * (values[rows + 1] - values[rows]), cols
+
+def sweep(cars, inputs, axes, metric='Monthly True Cost', resale_model=None):
+    """
+    Evaluates every car over a grid of one or two input axes (see SWEEP_AXES) in one broadcast pass.
+    Returns the cost surface (cars x axis 1 [x axis 2]) and, for every pair of cars, the points where
+    their costs cross (the break-even line on a 2D grid).
+    """
+    if not 1 <= len(axes) <= 2:
+        raise ValueError("Sweep takes one or two axes.")
+    if not 1 <= len(cars) <= MAX_SWEEP_CARS:
+        raise ValueError(f"Sweep takes 1 to {MAX_SWEEP_CARS} cars.")
+    if metric not in SWEEP_METRICS:
+        raise ValueError(f"Unknown sweep metric '{metric}'.")
+    if not all(isinstance(axis, dict) for axis in axes):
+        raise ValueError("Each sweep axis must be an object with a name.")
+    names = [axis.get('name') for axis in axes]
+    unknown = [name for name in names if name not in SWEEP_AXES]
+    if unknown or len(set(names)) != len(names):
+        raise ValueError(f"Sweep axes must be distinct and one of: {', '.join(sorted(SWEEP_AXES))}.")
+    grids = [_axis_values(axis) for axis in axes]
+
+    # grid axes in front, cars last: axis 1 -> (n1, 1, 1) or (n1, 1), axis 2 -> (n2, 1), cars -> (C,)
+    scenario = dict(inputs)
+    for i, (name, values) in enumerate(zip(names, grids)):
+        shaped = values.reshape((-1,) + (1,) * (len(grids) - i))
+        if name == 'mileage_scale':
+            scenario = _mileage_inputs(scenario, shaped)
+        elif name == 'annual_miles':
+            scenario.pop('commute_dist', None)
+            scenario['annual_miles'] = shaped
+        else:
+            scenario[name] = shaped
+
+    keys = set().union(*(car.keys() for car in cars))
+    columns = {key: [car.get(key, CAR_DEFAULTS.get(key)) for car in cars] for key in keys}
+    costs = _monthly_costs(columns, scenario, resale_model)
+    shape = tuple(len(values) for values in grids) + (len(cars),)
+    surface = np.moveaxis(np.broadcast_to(costs[SWEEP_METRICS[metric]], shape), -1, 0)
+
+    break_even = []
+    for i in range(len(cars)):
+        for j in range(i + 1, len(cars)):
+            diff = surface[i] - surface[j]
+            points = []
+            for axis in range(len(grids)):
+                crossing, other = _crossings(diff, grids[axis], axis)
+                for value, k in zip(crossing, other):
+                    point = {names[axis]: round(float(value), 4)}
+                    if len(grids) == 2:
+                        point[names[1 - axis]] = round(float(grids[1 - axis][k]), 4)
+                    points.append(point)
+            if points:
+                break_even.append({'cars': [i, j], 'points': points})
+
+    return {
+        'metric': metric,
+        'axes': [{'name': name, 'values': values.tolist()} for name, values in zip(names, grids)],
+        'surface': np.round(surface, 2).tolist(),
+        'break_even': break_even
+    }
+
+FINANCE_TERMS = [24, 36, 48, 60, 72, 84]
+LEASE_TERMS = [24, 36, 39, 48]
+MAX_TERMS = 24
+DEFAULT_UPFRONT_STEP = 100
+MAX_UPFRONT_STEPS = 400
+
+def _deal_terms(terms, name):
+    """Candidate terms as a float array of whole, positive months, or ValueError."""
+    try:
+        terms = np.asarray(terms, dtype=float)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a list of months.")
+    if terms.ndim != 1 or len(terms) > MAX_TERMS:
+        raise ValueError(f"{name} must be a list of up to {MAX_TERMS} terms.")
+    if not (np.isfinite(terms) & (terms > 0) & (terms == np.round(terms))).all():
+        raise ValueError(f"{name} must be whole, positive numbers of months.")
+    return terms
+
+def _pareto_front(monthly, total):
+    """Indices of the points no other point beats on both monthly outlay and total cost (both lower is better)."""
+    order = np.lexsort((total, monthly))
+    best_before = np.minimum.accumulate(np.concatenate([[np.inf], total[order]]))[:-1]
+    return order[total[order] < best_before]
+
+def optimize_deal(car_row, inputs, max_upfront=None, finance_terms=FINANCE_TERMS, lease_terms=LEASE_TERMS,
+                  upfront_step=DEFAULT_UPFRONT_STEP, resale_model=None):
+    """
+    Searches Cash, Finance (down payment x term) and Lease (due at signing x term) deals for one car,
+    with every candidate scored in a few broadcast passes of the vectorized TCO math.
+    Down payments and lease money due at signing run from 0 to max_upfront (default: the car's price)
+    in upfront_step increments. Finance uses inputs['apr']; leases use inputs['money_factor']
+    (default apr / 2400) and a residual from the resale model at the lease term.
+    Returns the candidates on the Pareto frontier of Monthly Outlay (Monthly Cash Flow plus the upfront cash
+    spread over the horizon) vs total true cost over the analysis horizon (inputs['years']), cheapest monthly first.
+    Upfront cash has to count on the monthly side: more down lowers both Monthly Cash Flow and the total,
+    so without it every frontier deal would sit at max_upfront.
+    Finance is scored on the interest actually paid within the horizon, so longer loans cost more.
+    Raises ValueError for a negative max_upfront, a non-positive step or terms that aren't whole, positive months.
+    """
+    price = float(car_row.get('price', 30000))
+    if max_upfront is not None:
+        max_upfront = _number(max_upfront, 'max_upfront')
+        if max_upfront < 0:
+            raise ValueError("max_upfront can't be negative.")
+    max_upfront = price if max_upfront is None else min(max_upfront, price)
+    upfront_step = _number(upfront_step, 'upfront_step')
+    if upfront_step <= 0:
+        raise ValueError("upfront_step must be positive.")
+    step = max(upfront_step, price / MAX_UPFRONT_STEPS, 1.0)
+    upfronts = np.unique(np.append(np.arange(0.0, max_upfront, step), max_upfront))
+    finance_terms = _deal_terms(finance_terms, 'finance_terms')
+    lease_terms = _deal_terms(lease_terms, 'lease_terms')
+
+    base = {key: value for key, value in inputs.items() if key not in ('lease_monthly', 'lease_due', 'lease_term', 'down_payment', 'term')}
+    years = base.get('years', 5)
+    car = {key: [value] for key, value in dict(car_row).items()}
+    candidates = []
+
+    def add(method, upfront, term, costs, valid=None):
+        shape = np.broadcast(costs['m_tco'], upfront, term).shape
+        columns = {
+            'method': np.full(shape, method, dtype=object),
+            'upfront': np.broadcast_to(upfront, shape),
+            'term': np.broadcast_to(term, shape),
+            'Monthly Payment': np.broadcast_to(costs['m_pmt'], shape),
+            'Monthly Cash Flow': np.broadcast_to(costs['m_cash_flow'], shape),
+            'Monthly True Cost': np.broadcast_to(costs['m_tco'], shape)
+        }
+        keep = np.ones(shape, dtype=bool) if valid is None else np.broadcast_to(valid, shape)
+        candidates.append({name: values[keep] for name, values in columns.items()})
+
+    if max_upfront >= price:
+        add('Cash', price, 0, _monthly_costs(car, dict(base, method='Cash'), resale_model))
+
+    # down payment x term
+    downs = upfronts[:, None]
+    finance = dict(base, method='Finance', down_payment=downs, term=finance_terms[None, :])
+    add('Finance', downs, finance_terms[None, :], _monthly_costs(car, finance, resale_model), downs < price)
+
+    # due at signing x term; the residual comes from the same resale path the other methods use
+    money_factor = _number(base.get('money_factor', base.get('apr', 6.0) / 2400), 'money_factor')
+    if money_factor < 0:
+        raise ValueError("money_factor can't be negative.")
+    if hasattr(resale_model, 'predict_future_value_many'):
+        residuals = resale_model.predict_future_value_many([dict(car_row)], lease_terms / 12)[0]
+    else:
+        residuals = np.asarray(_predict_value(car_row, lease_terms / 12, resale_model), dtype=float)
+    dues = upfronts[:, None]
+    payments = calculate_lease_payments(price, dues, residuals[None, :], lease_terms[None, :], money_factor)
+    lease = dict(base, method='Lease', lease_monthly=payments, lease_due=dues, lease_term=lease_terms[None, :])
+    add('Lease', dues, lease_terms[None, :], _monthly_costs(car, lease, resale_model), payments > 0)
+
+    pool = {name: np.concatenate([c[name] for c in candidates]) for name in candidates[0]}
+    pool['Monthly Outlay'] = pool['Monthly Cash Flow'] + pool['upfront'] / (12 * years)
+    pool['Total True Cost'] = pool['Monthly True Cost'] * 12 * years
+    front = _pareto_front(pool['Monthly Outlay'], pool['Total True Cost'])
+
+    frontier = []
+    for i in front:
+        deal = {'method': str(pool['method'][i]), 'upfront': round(float(pool['upfront'][i]), 2)}
+        if deal['method'] == 'Finance':
+            deal['term'] = int(pool['term'][i])
+        elif deal['method'] == 'Lease':
+            deal['lease_term'] = int(pool['term'][i])
+        for name in ('Monthly Payment', 'Monthly Cash Flow', 'Monthly Outlay', 'Monthly True Cost', 'Total True Cost'):
+            deal[name] = round(float(pool[name][i]), 2)
+        frontier.append(deal)
+
+    return {
+        'evaluated': int(len(pool['method'])),
+        'horizon_months': years * 12,
+        'max_upfront': max_upfront,
+        'frontier': frontier
+    }
+
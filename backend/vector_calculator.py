@@ -0,0 +1,311 @@
+import numpy as np
+import pandas as pd
+from financial_engine import calculate_loan_payments, amortization_schedule
+
+# scalar defaults used by cost_calculator when a car field is missing
+CAR_DEFAULTS = {
+    'price': 30000,
+    'city_mpg': 25,
+    'hwy_mpg': 30,
+    'reliability_score': 5,
+    'luxury_score': 5,
+    'range_miles': 250,
+}
+
+def _num_cars(cars):
+    if isinstance(cars, pd.DataFrame):
+        return len(cars)
+    return len(next(iter(cars.values())))
+
+def _car_column(cars, name):
+    """
+    Pulls one car field as a float array, filling the cost_calculator default if the column is missing.
+    """
+    if name in cars:
+        return np.asarray(cars[name], dtype=float)
+    return np.full(_num_cars(cars), float(CAR_DEFAULTS[name]))
+
+def _round(values, digits):
+    """
+    np.round, but values sitting on a half-cent tie go through Python's round so the result
+    matches calculate_tco exactly (np.round scales by 10**digits first and can land on the other side).
+    """
+    values = np.array(values, dtype=float)
+    rounded = np.round(values, digits)
+    scaled = values * 10**digits
+    near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6
+    if near_tie.any():
+        rounded[near_tie] = [round(float(v), digits) for v in values[near_tie]]
+    return rounded
+
+def _car_arrays(cars):
+    """
+    Converts a cars DataFrame (or dict of arrays) into the columns the TCO math needs.
+    """
+    arrays = {name: _car_column(cars, name) for name in CAR_DEFAULTS}
+    if 'fuel_type' in cars:
+        arrays['is_electric'] = np.asarray(cars['fuel_type']) == 'Electric'
+    else:
+        arrays['is_electric'] = np.zeros(_num_cars(cars), dtype=bool)
+    return arrays
+
+def _get_mileage_and_efficiency(car, inputs):
+    # annual mileage city/hwy split, same math as cost_calculator
+    if 'commute_dist' in inputs:
+        commute_daily_rt = np.asarray(inputs.get('commute_dist', 20))
+        days_week = np.asarray(inputs.get('days_week', 5))
+        road_trip_annual = np.asarray(inputs.get('road_trip_miles', 1000))
+        other_weekly = np.asarray(inputs.get('other_miles', 50))
+        commute_type = inputs.get('commute_type', 'Mixed')
+
+        commute_annual = commute_daily_rt * days_week * 50
+        other_annual = other_weekly * 52
+        annual_miles = commute_annual + road_trip_annual + other_annual
+
+        commute_hwy_pct = 0.45
+        if commute_type == "Mostly Highway": commute_hwy_pct = 0.85
+        elif commute_type == "Mostly City": commute_hwy_pct = 0.15
+
+        hwy_miles = (road_trip_annual * 1.0) + (commute_annual * commute_hwy_pct) + (other_annual * 0.2)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pct_hwy = np.where(annual_miles > 0, hwy_miles / annual_miles, 0.5)
+        pct_city = 1.0 - pct_hwy
+
+        avg_mpg = (car['city_mpg'] * pct_city) + (car['hwy_mpg'] * pct_hwy)
+    else:
+        annual_miles = np.asarray(inputs.get('annual_miles', 12000))
+        avg_mpg = (car['city_mpg'] * 0.55) + (car['hwy_mpg'] * 0.45)
+
+    # environment
+    climate = inputs.get('climate', 'Moderate')
+    terrain = inputs.get('terrain', 'Flat')
+    eff_modifier = np.ones_like(car['price'])
+
+    if climate == 'Cold (Winter)':
+        eff_modifier = eff_modifier * np.where(car['is_electric'], 0.75, 0.85)
+    elif climate == 'Hot (Summer)':
+        eff_modifier = eff_modifier * np.where(car['is_electric'], 0.85, 0.90)
+
+    if terrain == 'Hilly': eff_modifier = eff_modifier * 0.90
+    elif terrain == 'Mountainous': eff_modifier = eff_modifier * 0.80
+
+    adj_mpg = avg_mpg * eff_modifier
+
+    return annual_miles, adj_mpg, eff_modifier
+
+def _calculate_operational_costs(car, inputs, annual_miles, adj_mpg, eff_modifier):
+    gas_price = np.asarray(inputs.get('gas_price', 3.50))
+    elec_price = np.asarray(inputs.get('elec_price', 0.16))
+    elec_price_road = np.asarray(inputs.get('elec_price_road', 0.36))
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        # electric: home vs road charging
+        miles_per_kwh = adj_mpg / 33.7
+        fast_charge_miles = np.asarray(inputs.get('road_trip_miles', 0))
+        range_est = car['range_miles'] * eff_modifier
+        daily_commute = np.asarray(inputs.get('commute_dist', 20))
+
+        overflow_per_day = daily_commute - range_est
+        days_driven = np.asarray(inputs.get('days_week', 5)) * 50
+        fast_charge_miles = np.where(daily_commute > range_est, fast_charge_miles + (overflow_per_day * days_driven), fast_charge_miles)
+
+        home_charge_miles = np.maximum(0, annual_miles - fast_charge_miles)
+
+        cost_home = (home_charge_miles / miles_per_kwh) * elec_price
+        cost_fast = (fast_charge_miles / miles_per_kwh) * elec_price_road
+        ev_fuel = (cost_home + cost_fast) / 12
+
+        # gas/hybrid
+        gas_fuel = ((annual_miles / 12) / adj_mpg) * gas_price
+
+    monthly_fuel = np.where(car['is_electric'], ev_fuel, gas_fuel)
+
+    # maintenance for reliability + luxury
+    base_maint_rate = 0.09
+    rel_multiplier = 2.0 - ((car['reliability_score'] - 1) * (1.2 / 9))
+    lux_multiplier = 1.0 + (car['luxury_score'] * 0.05)
+    monthly_maint = ((annual_miles / 12) * base_maint_rate * rel_multiplier * lux_multiplier)
+
+    # age scaled insurance rates
+    custom_ins = np.asarray(inputs.get('custom_insurance', 0))
+    base_ins = (1200 + (car['price'] * 0.015)) / 12
+    driver_age = np.asarray(inputs.get('driver_age', 30))
+    age_factor = np.select(
+        [driver_age < 18, driver_age < 21, driver_age < 25, driver_age > 70],
+        [1.8, 1.5, 1.3, 1.2],
+        default=1.0
+    )
+    monthly_ins = np.where(custom_ins > 0, custom_ins, base_ins * age_factor)
+
+    return monthly_fuel, monthly_maint, monthly_ins
+
+def _predict_values(cars, car, years, resale_model):
+    """
+    Future value for every car, using the resale model when it can score a row.
+    """
+    dep_modifier = np.where(car['luxury_score'] > 7, 1.2, 1.0)
+    fallback = car['price'] * ((1 - (0.12 * dep_modifier)) ** years)
+    if not resale_model:
+        return fallback
+
+    if hasattr(resale_model, 'predict_future_value_many') and np.ndim(years) == 0:
+        # whole catalog in one call
+        try:
+            return resale_model.predict_future_value_many(cars, [years])[:, 0]
+        except:
+            pass
+
+    rows = cars.to_dict(orient='records') if isinstance(cars, pd.DataFrame) else pd.DataFrame(cars).to_dict(orient='records')
+    values = np.array(np.broadcast_to(fallback, np.broadcast(fallback, car['price']).shape), dtype=float)
+    for i, row in enumerate(rows):
+        try:
+            values[i] = resale_model.predict_future_value(row, years)
+        except:
+            pass
+    return values
+
+def _calculate_financials(cars, car, inputs, years, resale_model):
+    buying_method = inputs.get('method', 'Cash')
+    price = car['price']
+    zeros = np.zeros_like(price)
+
+    if buying_method == 'Cash':
+        future_value = _predict_values(cars, car, years, resale_model)
+        monthly_depreciation = (price - future_value) / (years * 12)
+        monthly_payment = zeros
+        upfront_cost = price
+
+    elif buying_method == 'Finance':
+        apr = inputs.get('apr', 6.0)
+        term = inputs.get('term', 60)
+        down_payment = np.asarray(inputs.get('down_payment', 0))
+
+        monthly_payment = calculate_loan_payments(price - down_payment, apr, term)
+        upfront_cost = down_payment + zeros
+
+        future_value = _predict_values(cars, car, years, resale_model)
+        monthly_depreciation = (price - future_value) / (years * 12)
+
+    elif buying_method == 'Lease':
+        user_monthly = np.asarray(inputs.get('lease_monthly', 0))
+        user_due = np.asarray(inputs.get('lease_due', 0))
+        user_term = np.asarray(inputs.get('lease_term', 36))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            quoted_dep = np.where(user_term > 0, user_due / user_term, 0)
+        monthly_payment = np.where(user_monthly > 0, user_monthly, price * 0.012)
+        upfront_cost = np.where(user_monthly > 0, user_due, 2000)
+        monthly_depreciation = np.where(user_monthly > 0, quoted_dep, 0.0) + zeros
+        future_value = zeros
+
+    else:
+        monthly_payment = zeros
+        monthly_depreciation = zeros
+        upfront_cost = zeros
+        future_value = zeros
+
+    return monthly_payment, monthly_depreciation, upfront_cost, future_value
+
+def _interest_paid(loan_amount, apr, term, horizon_months):
+    """
+    cost_calculator's calculate_interest_paid for arrays: interest summed over the amortization schedule's
+    first horizon months. term can be an array of candidate terms (scenario_calculator.optimize_deal).
+    """
+    return amortization_schedule(loan_amount, apr, term, int(horizon_months))['interest'].sum(axis=-1)
+
+def _monthly_costs(cars, inputs, resale_model=None):
+    """
+    Unrounded calculate_tco math for every car. Inputs can hold NumPy arrays (e.g. sampled prices),
+    which broadcast against the car columns. Returns the intermediate arrays by name.
+    """
+    years = inputs.get('years', 5)
+    car = _car_arrays(cars)
+
+    annual_miles, adj_mpg, eff_modifier = _get_mileage_and_efficiency(car, inputs)
+    m_fuel, m_maint, m_ins = _calculate_operational_costs(car, inputs, annual_miles, adj_mpg, eff_modifier)
+    m_pmt, m_dep, upfront, future_val = _calculate_financials(cars, car, inputs, years, resale_model)
+
+    m_ops = m_fuel + m_maint + m_ins
+    m_cash_flow = m_ops + m_pmt
+
+    buying_method = inputs.get('method', 'Cash')
+
+    if buying_method == 'Finance':
+        term = inputs.get('term', 60)
+        loan_amount = car['price'] - np.asarray(inputs.get('down_payment', 0))
+        apr = inputs.get('apr', 6.0)
+        avg_monthly_interest = _interest_paid(loan_amount, apr, term, years * 12) / (years * 12)
+        m_tco = m_ops + m_dep + avg_monthly_interest
+
+    elif buying_method == 'Lease':
+        lease_term = inputs.get('lease_term', 36)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            amortized_down = np.where(np.asarray(lease_term) > 0, upfront / lease_term, 0.0)
+        m_tco = m_ops + m_pmt + amortized_down
+
+    else:
+        m_tco = m_ops + m_dep
+
+    # 5 year total even when the analysis horizon is something else (only depreciation and loan interest depend on it)
+    if years == 5 or buying_method not in ('Cash', 'Finance'):
+        m_tco_5yr = m_tco
+    else:
+        m_dep_5yr = (car['price'] - _predict_values(cars, car, 5, resale_model)) / 60
+        if buying_method == 'Finance':
+            m_tco_5yr = m_ops + m_dep_5yr + _interest_paid(loan_amount, apr, term, 60) / 60
+        else:
+            m_tco_5yr = m_tco - m_dep + m_dep_5yr
+
+    return {
+        'car': car, 'years': years, 'buying_method': buying_method,
+        'annual_miles': annual_miles, 'adj_mpg': adj_mpg,
+        'm_fuel': m_fuel, 'm_maint': m_maint, 'm_ins': m_ins, 'm_ops': m_ops,
+        'm_pmt': m_pmt, 'm_dep': m_dep, 'upfront': upfront, 'future_val': future_val,
+        'm_cash_flow': m_cash_flow, 'm_tco': m_tco, 'm_tco_5yr': m_tco_5yr
+    }
+
+def calculate_tco_vectorized(cars, inputs, resale_model=None):
+    """
+    Columnar version of cost_calculator.calculate_tco.
+    Scores every car (DataFrame or dict of arrays) against one inputs dict in a single NumPy pass
+    and returns the same columns as the scalar function, rounded the same way.
+    """
+    costs = _monthly_costs(cars, inputs, resale_model)
+    car, buying_method = costs['car'], costs['buying_method']
+    m_pmt, m_fuel, m_maint, m_ins, m_dep = costs['m_pmt'], costs['m_fuel'], costs['m_maint'], costs['m_ins'], costs['m_dep']
+    upfront, m_cash_flow, m_tco, m_tco_5yr = costs['upfront'], costs['m_cash_flow'], costs['m_tco'], costs['m_tco_5yr']
+    annual_miles, adj_mpg, future_val = costs['annual_miles'], costs['adj_mpg'], costs['future_val']
+
+    shape = np.broadcast(m_tco, car['price']).shape
+    columns = {
+        'buying_method': np.full(shape, buying_method, dtype=object),
+        'Monthly Payment': _round(m_pmt, 2),
+        'Monthly Fuel': _round(m_fuel, 2),
+        'Monthly Maint': _round(m_maint, 2),
+        'Monthly Ins': _round(m_ins, 2),
+        'Monthly Dep': _round(m_dep, 2),
+        'Upfront Cost': _round(upfront, 2),
+        'Monthly Cash Flow': _round(m_cash_flow, 2),
+        'Monthly True Cost': _round(m_tco, 2),
+        'Total 5yr Cost': _round(m_tco_5yr * 60, 2),
+        'Calculated Annual Miles': _round(annual_miles, 0),
+        'Est MPG': _round(adj_mpg, 1),
+        'Resale Value': _round(future_val, 0)
+    }
+    columns = {name: np.broadcast_to(values, shape) for name, values in columns.items()}
+
+    if isinstance(cars, pd.DataFrame) and len(shape) == 1:
+        return pd.DataFrame(columns, index=cars.index)
+    return columns
+
+def rank_by_true_cost(df, inputs, top_k=None, resale_model=None):
+    """
+    Attaches TCO columns to every car and sorts by Monthly True Cost (cheapest first).
+    """
+    if df.empty:
+        return df.copy()
+    costs = calculate_tco_vectorized(df, inputs, resale_model=resale_model)
+    ranked = df.join(costs).sort_values('Monthly True Cost', kind='stable')
+    if top_k:
+        ranked = ranked.head(top_k)
+    return ranked
@@ -0,0 +1,53 @@
+"""
+Checks sync_cars against a cars table made by an older init_db (a copy of database/cars.db, which predates
+fun_score and the tracking columns): the first sync adds the missing columns and fills them, a second sync
+touches nothing, and the table ends up holding exactly the seed.
+
+    python database/check_sync.py
+"""
+import os
+import sys
+import shutil
+import tempfile
+import pandas as pd
+from sqlalchemy import create_engine, inspect
+from init_db import sync_cars
+from seed_data import COLUMNS, seed_dataframe
+
+OLD_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'cars.db')
+
+def main():
+    failures = []
+    df = seed_dataframe()
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'cars.db')
+        shutil.copy(OLD_DB, db_path)
+        engine = create_engine(f"sqlite:///{db_path}")
+        missing = [c for c in COLUMNS if c not in {col['name'] for col in inspect(engine).get_columns('cars')}]
+        if not missing:
+            failures.append("cars.db already has every seed column, so the old-schema path isn't exercised")
+
+        first = sync_cars(engine, df)
+        second = sync_cars(engine, df)
+        if not first:
+            failures.append("first sync touched nothing")
+        if second:
+            failures.append(f"second sync touched {second} rows, expected 0")
+
+        stored = pd.read_sql("SELECT * FROM cars WHERE NOT deleted", engine)
+        stored = stored[COLUMNS].sort_values(['make', 'model', 'year'], ignore_index=True)
+        expected = df[COLUMNS].sort_values(['make', 'model', 'year'], ignore_index=True)
+        try:
+            # the old table declares some integer seed columns REAL
+            pd.testing.assert_frame_equal(stored, expected, check_dtype=False)
+        except AssertionError as e:
+            failures.append(f"live rows don't match the seed after syncing: {e}")
+        engine.dispose()
+
+    print(f"added {missing}, synced {first} then {second} rows")
+    for failure in failures:
+        print(f"❌ {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
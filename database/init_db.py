@@ -1,6 +1,104 @@
 import os
+from datetime import datetime, timezone
 import pandas as pd
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, inspect, text
+from seed_data import COLUMNS, seed_dataframe
+
+KEY_COLUMNS = ['make', 'model', 'year']
+# change tracking: every write bumps catalog_meta.version and stamps the touched rows with it,
+# so the backend can pull only rows with row_version > the version it last saw
+TRACKING_COLUMNS = {'row_version': 'BIGINT NOT NULL DEFAULT 0', 'updated_at': 'TIMESTAMP', 'deleted': 'BOOLEAN NOT NULL DEFAULT FALSE'}
+
+def _column_ddl(dtype):
+    """SQL type for a seed column that an older table doesn't have yet."""
+    if pd.api.types.is_bool_dtype(dtype):
+        return 'BOOLEAN'
+    if pd.api.types.is_integer_dtype(dtype):
+        return 'BIGINT'
+    if pd.api.types.is_float_dtype(dtype):
+        return 'DOUBLE PRECISION'
+    return 'TEXT'
+
+def _changed_rows(existing, df):
+    """Splits the seed into rows that are new and rows whose values differ from what the table holds."""
+    current = existing[~existing['deleted'].astype(bool)]
+    merged = df.merge(current[COLUMNS], on=KEY_COLUMNS, how='left', suffixes=('', '__db'), indicator=True)
+    new_rows = merged['_merge'] == 'left_only'
+    differs = pd.Series(False, index=merged.index)
+    for col in COLUMNS:
+        if col in KEY_COLUMNS:
+            continue
+        ours, theirs = merged[col], merged[f'{col}__db']
+        differs |= (ours != theirs) & ~(ours.isna() & theirs.isna())
+    return df[new_rows.to_numpy()], df[(differs & ~new_rows).to_numpy()]
+
+def sync_cars(engine, df):
+    """
+    Upserts the seed into cars instead of replacing the table: only new, changed or removed cars get a new
+    row_version (removed ones are soft-deleted), and catalog_meta.version is bumped once if anything changed.
+    Returns the number of rows touched.
+    """
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE IF NOT EXISTS catalog_meta (id INTEGER PRIMARY KEY, version BIGINT NOT NULL)"))
+        version = conn.execute(text("SELECT version FROM catalog_meta WHERE id = 1")).scalar()
+        if version is None:
+            version = 0
+            conn.execute(text("INSERT INTO catalog_meta (id, version) VALUES (1, 0)"))
+        next_version = version + 1
+
+        inspector = inspect(conn)
+        if not inspector.has_table('cars'):
+            tracked = df.assign(row_version=next_version, updated_at=now, deleted=False)
+            tracked.to_sql('cars', conn, index=False, method='multi')
+            conn.execute(text("CREATE INDEX IF NOT EXISTS cars_row_version_idx ON cars (row_version)"))
+            conn.execute(text("UPDATE catalog_meta SET version = :v WHERE id = 1"), {'v': next_version})
+            return len(df)
+
+        # tables created by the old replace-based init get the tracking columns added in place
+        existing_columns = {col['name'] for col in inspector.get_columns('cars')}
+        for col, ddl in TRACKING_COLUMNS.items():
+            if col not in existing_columns:
+                conn.execute(text(f"ALTER TABLE cars ADD COLUMN {col} {ddl}"))
+        conn.execute(text("CREATE INDEX IF NOT EXISTS cars_row_version_idx ON cars (row_version)"))
+        # same for seed columns added since the table was made; they start NULL, so every row reads as changed
+        for col in COLUMNS:
+            if col not in existing_columns:
+                conn.execute(text(f'ALTER TABLE cars ADD COLUMN "{col}" {_column_ddl(df[col].dtype)}'))
+
+        existing = pd.read_sql(text(f"SELECT {', '.join(KEY_COLUMNS + [c for c in COLUMNS if c not in KEY_COLUMNS])}, deleted FROM cars"), conn)
+        new_rows, changed_rows = _changed_rows(existing, df)
+        live = existing[~existing['deleted'].astype(bool)]
+        removed = live.merge(df[KEY_COLUMNS], on=KEY_COLUMNS, how='left', indicator=True)
+        removed = removed[removed['_merge'] == 'left_only'][KEY_COLUMNS]
+        # a previously deleted car coming back is an update of its old row
+        revived = new_rows.merge(existing[KEY_COLUMNS], on=KEY_COLUMNS, how='inner')
+        new_rows = new_rows.merge(existing[KEY_COLUMNS], on=KEY_COLUMNS, how='left', indicator=True)
+        new_rows = new_rows[new_rows['_merge'] == 'left_only'][COLUMNS]
+        changed_rows = pd.concat([changed_rows, revived[COLUMNS]], ignore_index=True)
+
+        touched = len(new_rows) + len(changed_rows) + len(removed)
+        if not touched:
+            return 0
+
+        tracking = {'row_version': next_version, 'updated_at': now}
+        if len(changed_rows):
+            assignments = ', '.join(f'"{col}" = :{col}' for col in COLUMNS if col not in KEY_COLUMNS)
+            conn.execute(
+                text(f"UPDATE cars SET {assignments}, row_version = :row_version, updated_at = :updated_at, deleted = FALSE "
+                     "WHERE make = :make AND model = :model AND year = :year"),
+                [dict(row, **tracking) for row in changed_rows.to_dict(orient='records')]
+            )
+        if len(removed):
+            conn.execute(
+                text("UPDATE cars SET row_version = :row_version, updated_at = :updated_at, deleted = TRUE "
+                     "WHERE make = :make AND model = :model AND year = :year"),
+                [dict(row, **tracking) for row in removed.to_dict(orient='records')]
+            )
+        if len(new_rows):
+            new_rows.assign(deleted=False, **tracking).to_sql('cars', conn, if_exists='append', index=False, method='multi')
+        conn.execute(text("UPDATE catalog_meta SET version = :v WHERE id = 1"), {'v': next_version})
+    return touched
 
 def init_db():
     db_host = os.environ.get('DB_HOST')
@@ -43,52 +141,12 @@ def init_db():
         print(f"❌ Connection failed: {e}")
         return
 
-    cars_data = [
-        # --- HYBRIDS --- (make, model, year, class, price, city, hwy, fuel, rel, lux, features, cargo, leg, accel, review, assist_score, assist_name, link, offroad, seats, FUN_SCORE)
-        ('Toyota', 'Prius', 2024, 'Sedan', 28000, 57, 56, 'Hybrid', 9.5, 5, 'Toyota Safety Sense 3.0, Wireless CarPlay, Solar Roof, Heated Seats', 20.3, 34.8, 7.2, "Pros: Incredible MPG, sleek new design. Cons: Rear headroom is tight.", 7, "Toyota Safety Sense™ 3.0", "https://www.toyota.com/safety-sense/", 2, 5, 3),
-        ('Honda', 'CR-V Hybrid', 2024, 'SUV', 34000, 43, 36, 'Hybrid', 9.0, 6, 'Honda Sensing, Bose Audio, Leather Seats, Moonroof', 39.3, 41.0, 7.6, "Pros: Spacious interior, smooth hybrid system. Cons: No spare tire.", 6, "Honda Sensing®", "https://automobiles.honda.com/sensing", 5, 5, 3),
-        ('Ford', 'Maverick Hybrid', 2024, 'Pickup', 26000, 42, 33, 'Hybrid', 8.0, 4, 'FLEXBED System, Apple CarPlay, Ford Co-Pilot360, Crew Cab', 33.3, 36.9, 7.7, "Pros: Unbeatable price and MPG for a truck. Cons: Cheap interior plastics.", 5, "Ford Co-Pilot360™", "https://www.ford.com/technology/driver-assist-technology/", 4, 5, 5),
-        ('Lexus', 'ES 300h', 2024, 'Sedan', 44000, 43, 44, 'Hybrid', 9.5, 8, 'Lexus Safety System+ 2.5, Mark Levinson Audio, Ultra Luxury Package', 13.9, 39.2, 8.1, "Pros: Extremely quiet, plush ride, excellent fuel economy. Cons: Not sporty.", 7, "Lexus Safety System+ 2.5", "https://www.lexus.com/safety", 2, 5, 3),
-        ('Toyota', 'RAV4 Hybrid', 2024, 'SUV', 32000, 41, 38, 'Gas', 9.5, 5, 'Digital Rearview Mirror, JBL Audio, Panoramic Glass Roof', 37.5, 37.8, 7.4, "Pros: High MPG, practical cargo shape. Cons: Engine can drone on highway.", 6, "Toyota Safety Sense™ 2.5", "https://www.toyota.com/safety-sense/", 6, 5, 3),
-
-        # --- GAS ---
-        ('Toyota', 'Camry', 2024, 'Sedan', 28000, 28, 39, 'Gas', 9.0, 5, 'Apple CarPlay, Toyota Safety Sense 2.5+, 9-inch Touchscreen, Dual-Zone Climate', 15.1, 38.0, 7.6, "Pros: Comfortable ride, user-friendly controls. Cons: Noisier cabin than some rivals.", 6, "Toyota Safety Sense™ 2.5+", "https://www.toyota.com/safety-sense/", 2, 5, 3),
-        ('Honda', 'Civic', 2024, 'Sedan', 26000, 31, 40, 'Gas', 9.0, 4, 'Honda Sensing, Bose Audio, 9-inch Screen, Wireless CarPlay', 14.8, 37.4, 7.5, "Pros: Agile handling, spacious cabin for a compact. Cons: Road noise.", 6, "Honda Sensing®", "https://automobiles.honda.com/sensing", 2, 5, 6),
-        ('BMW', '3 Series', 2024, 'Sedan', 48000, 25, 34, 'Gas', 6.5, 8, 'iDrive 8 Curved Display, Vernasca Leather, Head-up Display, M Sport Package', 17.0, 35.2, 5.6, "Pros: Powerful engines, excellent handling balance. Cons: Steering lacks feedback.", 8, "Driving Assistant Professional", "https://www.bmwusa.com/technology/driver-assistance.html", 3, 5, 8),
-        ('Mercedes-Benz', 'C-Class', 2024, 'Sedan', 49000, 23, 33, 'Gas', 6.0, 9, 'MBUX AI, Burmester 3D Audio, 64-Color Ambient Lighting, Augmented Video Nav', 12.6, 36.0, 6.0, "Pros: Stunning interior design, tech-forward. Cons: Touch-sensitive controls can be finicky.", 8, "Driver Assistance Package", "https://www.mbusa.com/en/technology/safety", 3, 5, 7),
-        ('Nissan', 'Versa', 2024, 'Sedan', 18000, 32, 40, 'Gas', 7.5, 2, 'Zero Gravity Seats, Safety Shield 360, Wireless Charging', 14.7, 31.0, 10.0, "Pros: Lots of safety tech for the price. Cons: Slow acceleration, tight back seat.", 5, "Nissan Safety Shield® 360", "https://www.nissanusa.com/experience-nissan/intelligent-mobility/safety-shield.html", 1, 5, 2),
-        ('Kia', 'Telluride', 2024, 'SUV', 38000, 20, 26, 'Gas', 8.5, 7, 'Dual Panoramic Screens, Nappa Leather, Driver Talk Intercom, Quiet Mode', 21.0, 42.4, 7.0, "Pros: Upscale feel, adult-friendly 3rd row. Cons: Fuel economy is average.", 7, "Highway Driving Assist 2", "https://www.kia.com/us/en/drive-wise", 5, 7, 5),
-        ('Lexus', 'RX', 2024, 'SUV', 52000, 22, 29, 'Gas', 9.5, 9, 'Mark Levinson PurePlay, Traffic Jam Assist, E-Latch Door Handles', 29.6, 37.4, 7.2, "Pros: Ultra-quiet cabin, plush ride. Cons: Fussy infotainment in older models.", 7, "Lexus Safety System+ 3.0", "https://www.lexus.com/safety", 4, 5, 4),
-        ('Subaru', 'Outback', 2024, 'SUV', 30000, 26, 32, 'Gas', 8.5, 5, 'EyeSight Driver Assist, StarTex Water-Repellent Upholstery, Roof Rails', 32.5, 39.5, 8.5, "Pros: Standard AWD, rugged utility. Cons: CVT transmission feels rubbery.", 6, "Subaru EyeSight®", "https://www.subaru.com/engineering/eyesight.html", 8, 5, 4),
-        ('Ford', 'F-150', 2024, 'Pickup', 45000, 20, 26, 'Gas', 7.5, 6, 'Pro Power Onboard (Generator), BlueCruise Hands-Free, Max Recline Seats', 52.8, 43.6, 6.0, "Pros: Class-leading towing, generator feature. Cons: Gets expensive quickly.", 9, "Ford BlueCruise Hands-Free", "https://www.ford.com/technology/bluecruise/", 8, 5, 5),
-        ('Ram', '1500', 2024, 'Pickup', 48000, 19, 24, 'Gas', 7.0, 7, 'Multi-Function Tailgate, RamBox Cargo Management, 12-inch Uconnect', 53.9, 45.2, 6.5, "Pros: Best ride quality in class (coil springs), luxury interior. Cons: Lower towing than Ford.", 5, "Advanced Safety Group", "https://www.ramtrucks.com/safety-security.html", 7, 5, 6),
-        ('Porsche', '911', 2024, 'Sports', 115000, 18, 24, 'Gas', 7.5, 9, 'PDK Transmission, Sport Chrono Package, Wet Mode', 4.6, 27.0, 3.5, "Pros: Telepathic steering, timeless design. Cons: Expensive options list, tiny back seat.", 7, "Porsche InnoDrive", "https://www.porsche.com/international/technology/innodrive/", 2, 4, 10),
-        ('Mazda', 'MX-5 Miata', 2024, 'Sports', 29000, 26, 35, 'Gas', 8.5, 5, 'Kinematic Posture Control, Bilstein Dampers, Brembo Brakes', 4.6, 0.0, 6.0, "Pros: Pure driving joy, easy manual top. Cons: Tight cabin, noisy at highway speeds.", 4, "i-Activsense®", "https://www.mazdausa.com/why-mazda/safety", 2, 2, 10),
-
-        # --- ELECTRIC ---
-        ('Tesla', 'Model 3', 2024, 'Sedan', 40000, 130, 138, 'Electric', 7.0, 7, 'Autopilot, 15-inch Center Screen, Glass Roof, Dog Mode, Phone Key', 19.8, 35.2, 5.8, "Pros: Supercharger network, instant torque. Cons: Distracting screen-only controls.", 9, "Autopilot / FSD Capability", "https://www.tesla.com/autopilot", 3, 5, 8),
-        ('Lucid', 'Air', 2024, 'Sedan', 78000, 135, 140, 'Electric', 6.0, 9, '34-inch Glass Cockpit, DreamDrive Pro, Massage Seats, Frunk', 32.0, 41.0, 3.0, "Pros: Incredible range and power, spacious. Cons: Software bugs, low roofline entry.", 8, "DreamDrive™ Pro", "https://www.lucidmotors.com/dreamdrive", 3, 5, 8),
-        ('Hyundai', 'Ioniq 5', 2024, 'SUV', 42000, 132, 110, 'Electric', 8.0, 7, 'Vehicle-to-Load (V2L), Relaxion Reclining Seats, Sliding Center Console', 27.2, 39.4, 5.0, "Pros: Fast charging capability, retro design. Cons: No rear wiper, small frunk.", 7, "Highway Driving Assist 2", "https://www.hyundaiusa.com/us/en/safety", 4, 5, 7),
-        ('Rivian', 'R1S', 2024, 'SUV', 78000, 73, 65, 'Electric', 6.5, 9, 'Camp Mode, Pet Mode, Portable Speaker, Air Suspension', 104.0, 36.6, 3.0, "Pros: Legit off-road chops, sports car speed. Cons: Firm ride on pavement.", 8, "Rivian Driver+", "https://rivian.com/experience/technology", 10, 7, 8),
-        ('Rivian', 'R1T', 2024, 'Pickup', 75000, 70, 65, 'Electric', 6.0, 9, 'Gear Tunnel, Built-in Air Compressor, Hydraulic Roll Control', 62.0, 36.6, 3.0, "Pros: Clever storage (Gear Tunnel), incredible performance. Cons: Service center availability.", 8, "Rivian Driver+", "https://rivian.com/experience/technology", 10, 5, 8),
-        ('Chevrolet', 'Bolt EV', 2023, 'Hatchback', 27000, 120, 110, 'Electric', 7.0, 3, 'Super Cruise, Sport Mode, Regen on Demand Paddle', 16.6, 36.0, 6.5, "Pros: Great value EV, punchy acceleration. Cons: Slow DC fast charging speeds.", 8, "Super Cruise™", "https://www.chevrolet.com/electric/super-cruise", 2, 5, 5)
-    ]
-    
-    columns = [
-        'make', 'model', 'year', 'class', 'price', 
-        'city_mpg', 'hwy_mpg', 'fuel_type', 
-        'reliability_score', 'luxury_score', 'features', 
-        'cargo_space', 'rear_legroom', 'acceleration', 
-        'review_summary', 'driver_assist_score', 'driver_assist_name', 
-        'driver_assist_link', 'offroad_capability', 'seats', 'fun_score'
-    ]
-
-    df = pd.DataFrame(cars_data, columns=columns)
+    df = seed_dataframe()
 
-    print("📥 Inserting into database...")
+    print("📥 Syncing into database...")
     try:
-        df.to_sql('cars', engine, if_exists='replace', index=False, method='multi')
-        print(f"✅ Database initialized successfully with {len(df)} records!")
+        touched = sync_cars(engine, df)
+        print(f"✅ Database synced: {touched} of {len(df)} records changed!")
     except Exception as e:
         print(f"❌ Error inserting data: {e}")
 
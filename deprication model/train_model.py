@@ -0,0 +1,48 @@
+"""
+Trains the resale value model from a CSV of historical listings and writes the coefficient artifact
+the Lambda loads (backend/artifacts/resale_model.json by default).
+
+CSV columns:
+  msrp, price, age_years                 required (price = what the used car listed/sold for)
+  luxury_score, reliability_score        optional, default 5
+  fuel_type                              optional ('Electric' / 'Hybrid' / anything else)
+
+Usage:
+  python train_model.py listings.csv
+  python train_model.py listings.csv --out ../backend/artifacts/resale_model.json
+"""
+import argparse
+import os
+import sys
+import pandas as pd
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend')
+sys.path.append(BACKEND_DIR)
+from resale_model import ResaleModel, FEATURES, AGE_TERMS
+
+REQUIRED_COLUMNS = ['msrp', 'price', 'age_years']
+
+def main():
+    parser = argparse.ArgumentParser(description="Fit the resale value model on historical listings.")
+    parser.add_argument('csv', help="Listings CSV (see module docstring for columns).")
+    parser.add_argument('--out', default=os.path.join(BACKEND_DIR, 'artifacts', 'resale_model.json'), help="Where to write the artifact.")
+    args = parser.parse_args()
+
+    listings = pd.read_csv(args.csv)
+    missing = [col for col in REQUIRED_COLUMNS if col not in listings.columns]
+    if missing:
+        sys.exit(f"{args.csv} is missing required columns: {', '.join(missing)}")
+    for col in ['luxury_score', 'reliability_score', 'fuel_type']:
+        if col not in listings.columns:
+            print(f"Warning: no '{col}' column, every listing uses the default.")
+
+    model = ResaleModel.fit(listings)
+    model.save(args.out)
+
+    print(f"Trained on {model.trained_rows} of {len(listings)} listings (log-retention RMSE {model.rmse:.4f}).")
+    for term, row in zip(AGE_TERMS, model.coef):
+        print(f"  {term:>8}: " + ", ".join(f"{name}={value:+.4f}" for name, value in zip(FEATURES, row)))
+    print(f"Saved to {args.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+# generated Bedrock pitches, shared by every Lambda container (see backend/pitch_cache.py)
+resource "aws_dynamodb_table" "pitch_cache" {
+  name         = "${var.project_name}-pitch-cache"
+  billing_mode = "PAY_PER_REQUEST"
+  hash_key     = "pitch_key"
+
+  attribute {
+    name = "pitch_key"
+    type = "S"
+  }
+
+  ttl {
+    attribute_name = "expires_at"
+    enabled        = true
+  }
+}
@@ -10,7 +10,18 @@ API_URL = os.getenv("API_URL")
 if not API_URL:
     st.error("⚠️ API_URL environment variable is missing. The app cannot connect to the backend.")
 
-api_client = APIClient(API_URL)
+@st.cache_resource(show_spinner=False)
+def get_api_client():
+    # one client per server process, so every session shares its response cache and in-flight requests
+    read_timeout = os.getenv("API_READ_TIMEOUT")
+    return APIClient(
+        API_URL,
+        connect_timeout=float(os.getenv("API_CONNECT_TIMEOUT", 3.05)),
+        read_timeout=float(read_timeout) if read_timeout else None,
+        retries=int(os.getenv("API_RETRIES", 2))
+    )
+
+api_client = get_api_client()
 
 if 'deal_car' not in st.session_state:
     st.session_state.deal_car = None
@@ -25,6 +36,7 @@ if 'pitch_map' not in st.session_state:
 def get_cached_data():
     return load_data(API_URL)
 
+# slim listing (LISTING_FIELDS); full rows come from api_client.get_cars when a car is picked
 df_full = get_cached_data()
 
 st.title("🚗 Perfect Car Picker")
@@ -78,8 +90,12 @@ st.sidebar.divider()
 st.sidebar.header("🛠️ System")
 if st.sidebar.button("🔄 Force Data Refresh", help="Clears the cached fallback data and forces a fresh connection to the database."):
     st.cache_data.clear()
+    api_client.clear_cache()
     st.rerun()
 
+with st.sidebar.expander("🐞 Debug: API Cache", expanded=False):
+    st.json(api_client.cache_stats())
+
 tab1, tab2, tab4 = st.tabs(["💡 Help Me Choose", "📊 Compare Cars", "💰 Deal Analyzer"])
 
 with tab1:
@@ -156,6 +172,9 @@ with tab1:
 
         submitted = st.form_submit_button("🔍 Analyze & Find Matches")
 
+    ai_instruction = f"{priority}. Please also include a response based on the 'Pros' of the vehicle from its reviews, and explicitly list out the vehicle's notable features."
+    top_pitch_stream = None
+
     if submitted:
         if not fuel_choices:
             st.error("Please select at least one Fuel Type.")
@@ -166,44 +185,48 @@ with tab1:
                 target_fun, target_offroad, seats_needs
             )
             
+            tco_inputs = {
+                'years': years_ownership, 
+                'gas_price': gas_price, 
+                'elec_price': elec_price,
+                'elec_price_road': elec_price_fast,
+                'method': global_method, 'apr': global_apr, 'term': global_term, 'down_payment': global_down,
+                'commute_dist': commute_dist, 'days_week': days_week, 'commute_type': commute_type,
+                'road_trip_miles': road_trip_miles, 'other_miles': other_miles,
+                'climate': env_climate, 'terrain': env_terrain,
+                'driver_age': driver_age_est
+            }
+            
+            hard_filters = AppLogic.build_hard_filters(fuel_choices, calc_budget, target_class, desired_features, seats_needs)
+            
+            rank_options = {}
+            if priority == "Lowest Total Cost":
+                # let the Lambda price every candidate before anything is cut
+                rank_options = {'tco_inputs': tco_inputs, 'rank_by': 'true_cost'}
+            
             with st.spinner("Finding matches via AWS Lambda..."):
-                recs_df = api_client.get_recommendations(user_prefs)
+                recs_df = api_client.get_recommendations(user_prefs, filters=hard_filters, top_k=5, **rank_options)
 
             if recs_df.empty:
-                st.warning("No matches found from API.")
+                st.warning("No matches met your strict Price, Fuel Type, Primary Use, Seats, and Must-Haves requirements. Try relaxing your filters or increasing your budget.")
                 st.session_state.search_results = None
             else:
-                tco_inputs = {
-                    'years': years_ownership, 
-                    'gas_price': gas_price, 
-                    'elec_price': elec_price,
-                    'elec_price_road': elec_price_fast,
-                    'method': global_method, 'apr': global_apr, 'term': global_term, 'down_payment': global_down,
-                    'commute_dist': commute_dist, 'days_week': days_week, 'commute_type': commute_type,
-                    'road_trip_miles': road_trip_miles, 'other_miles': other_miles,
-                    'climate': env_climate, 'terrain': env_terrain,
-                    'driver_age': driver_age_est
-                }
-                
-                results_df = AppLogic.filter_and_process_results(
-                    recs_df, fuel_choices, calc_budget, target_class, 
-                    desired_features, api_client, tco_inputs, total_subs, priority
-                )
+                with st.spinner("Pricing matches..."):
+                    # the top match's pitch only needs its specs, so its stream opens alongside the cost batch
+                    top_pitch_stream = api_client.prefetch_stream(api_client.stream_ai_pitch(recs_df.iloc[0], ai_instruction))
+                    results_df = AppLogic.filter_and_process_results(
+                        recs_df, calc_budget, desired_features, 
+                        api_client, tco_inputs, total_subs
+                    )
                 
                 if results_df.empty:
-                    st.warning("Matches found, but none met your strict Price, Fuel Type, Primary Use, and Must-Haves requirements. Try relaxing your filters or increasing your budget.")
+                    st.warning("Matches found, but cost analysis failed. Please try again.")
                     st.session_state.search_results = None
                 else:
                     st.session_state.search_results = results_df
+                    # the top match's pitch streams into its card below as the results render
                     st.session_state.pitch_map = {}
-                    
-                    top_idx = results_df.index[0]
-                    top_car = results_df.iloc[0]
-                    
-                    with st.spinner(f"Auto-analyzing top match: {top_car['model']}..."):
-                        ai_instruction = f"{priority}. Please also include a response based on the 'Pros' of the vehicle from its reviews, and explicitly list out the vehicle's notable features."
-                        pitch = api_client.get_ai_pitch(top_car, ai_instruction)
-                        st.session_state.pitch_map[top_idx] = pitch
+                    st.session_state.auto_pitch = results_df.index[0]
 
     if st.session_state.search_results is not None:
         st.divider()
@@ -227,6 +250,10 @@ with tab1:
                     
                 if idx in st.session_state.pitch_map:
                     st.info(f"🤖 **AI Analysis:** {st.session_state.pitch_map[idx]}")
+                elif idx == st.session_state.get('auto_pitch'):
+                    st.markdown("🤖 **AI Analysis:**")
+                    stream = top_pitch_stream if top_pitch_stream is not None else api_client.stream_ai_pitch(row, ai_instruction)
+                    st.session_state.pitch_map[idx] = st.write_stream(stream)
 
                 c1, c2, c3, c4 = st.columns(4)
                 c1.metric("Price", f"${row.get('price',0):,.0f}")
@@ -238,11 +265,8 @@ with tab1:
 
                 if idx not in st.session_state.pitch_map:
                     if st.button(f"🤖 Why buy this?", key=f"ai_{idx}"):
-                        with st.spinner("Asking AI..."):
-                            ai_instruction = f"{priority}. Please also include a response based on the 'Pros' of the vehicle from its reviews, and explicitly list out the vehicle's notable features."
-                            pitch = api_client.get_ai_pitch(row, ai_instruction)
-                            st.session_state.pitch_map[idx] = pitch
-                            st.rerun() 
+                        st.session_state.pitch_map[idx] = st.write_stream(api_client.stream_ai_pitch(row, ai_instruction))
+                        st.rerun() 
 
                 if st.button(f"💰 Deep Dive", key=f"btn_{idx}"):
                     st.session_state.deal_car = f"{row['make']} {row['model']} ({row['year']})"
@@ -273,13 +297,16 @@ with tab2:
         if compare_selection:
             rows_to_display = []
             
+            std_selection = [sel for sel in compare_selection if sel not in deal_options]
+            listing_rows = [df_display[df_display['display_name'] == sel].iloc[0].to_dict() for sel in std_selection]
+            full_rows = dict(zip(std_selection, AppLogic.fetch_full_rows(listing_rows, api_client)))
+            
             for sel in compare_selection:
                 if sel in deal_options:
                     found_deal = next(d for d in custom_deals if d['display_name'] == sel).copy()
                     rows_to_display.append(found_deal)
                 else:
-                    row = df_display[df_display['display_name'] == sel].iloc[0].to_dict()
-                    rows_to_display.append(row)
+                    rows_to_display.append(full_rows[sel])
             
             comp_df = pd.DataFrame(rows_to_display)
             
@@ -291,18 +318,18 @@ with tab2:
             st.markdown("### 🧮 Total Cost of Ownership (TCO)")
             st.info("Calculate depreciation, fuel, insurance, and maintenance costs over 1, 3, and 5 years based on your global settings.")
             
+            global_tco_inputs = {
+                'gas_price': gas_price, 
+                'elec_price': elec_price,
+                'elec_price_road': elec_price_fast,
+                'method': global_method, 'apr': global_apr, 'term': global_term, 'down_payment': global_down,
+                'commute_dist': commute_dist, 'days_week': days_week, 'commute_type': commute_type,
+                'road_trip_miles': road_trip_miles, 'other_miles': other_miles,
+                'climate': env_climate, 'terrain': env_terrain,
+                'driver_age': driver_age_est
+            }
+            
             if st.button("Calculate TCO for Selected Cars", type="primary"):
-                global_tco_inputs = {
-                    'gas_price': gas_price, 
-                    'elec_price': elec_price,
-                    'elec_price_road': elec_price_fast,
-                    'method': global_method, 'apr': global_apr, 'term': global_term, 'down_payment': global_down,
-                    'commute_dist': commute_dist, 'days_week': days_week, 'commute_type': commute_type,
-                    'road_trip_miles': road_trip_miles, 'other_miles': other_miles,
-                    'climate': env_climate, 'terrain': env_terrain,
-                    'driver_age': driver_age_est
-                }
-                
                 with st.spinner("Calculating multi-year costs via API..."):
                     tco_df = AppLogic.calculate_comparison_tcos(rows_to_display, global_tco_inputs, api_client, total_subs)
                     tco_display = AppLogic.format_tco_dataframe(tco_df)
@@ -310,6 +337,36 @@ with tab2:
                 st.markdown("#### TCO Results")
                 st.dataframe(tco_display.astype(str))
 
+            if len(rows_to_display) >= 2:
+                st.divider()
+                st.markdown("### ⛽ Gas Price Break-even")
+                st.info("Monthly true cost of each car across gas prices (your global settings otherwise), to see where an EV or hybrid starts winning.")
+                
+                if st.button("Run Gas Price Sweep"):
+                    sweep_rows = [{k: v for k, v in r.items() if k not in ['deal_inputs', 'is_deal']} for r in rows_to_display]
+                    names = [r.get('display_name', f"{r.get('make')} {r.get('model')}") for r in rows_to_display]
+                    with st.spinner("Sweeping gas prices via API..."):
+                        sweep = api_client.sweep(sweep_rows, global_tco_inputs, [{'name': 'gas_price', 'start': 2.0, 'stop': 7.0, 'steps': 51}])
+                    
+                    if not sweep:
+                        st.error("Sweep failed via API")
+                    else:
+                        prices = sweep['axes'][0]['values']
+                        sweep_df = pd.DataFrame([
+                            {'Gas Price ($/gal)': price, 'Vehicle': name, 'Monthly True Cost': cost + total_subs}
+                            for name, costs in zip(names, sweep['surface'])
+                            for price, cost in zip(prices, costs)
+                        ])
+                        fig = px.line(sweep_df, x='Gas Price ($/gal)', y='Monthly True Cost', color='Vehicle')
+                        st.plotly_chart(fig, use_container_width=True)
+                        
+                        if not sweep['break_even']:
+                            st.caption("No break-even between $2 and $7/gal: the ranking doesn't change in that range.")
+                        for pair in sweep['break_even']:
+                            i, j = pair['cars']
+                            for point in pair['points']:
+                                st.caption(f"⚖️ **{names[i]}** and **{names[j]}** cost the same at **${point['gas_price']:.2f}/gal**.")
+
             st.divider()
             st.markdown("### Performance Chart")
             fig = px.scatter(comp_df, x='price', y='acceleration', color='make', size='city_mpg', hover_data=['model'])
@@ -328,9 +385,8 @@ with tab4:
             default_ix = car_options.index(st.session_state.deal_car)
         
         selected_car_str = st.selectbox("Select Vehicle", car_options, index=default_ix)
-        make, model_raw = selected_car_str.split(" ", 1)
-        model = model_raw.split(" (")[0]
-        car_row = df_full[(df_full['make'] == make) & (df_full['model'] == model)].iloc[0]
+        listing_row = df_full.iloc[car_options.index(selected_car_str)].to_dict()
+        car_row = pd.Series(AppLogic.fetch_full_rows([listing_row], api_client)[0])
         
         col1, col2 = st.columns(2)
         with col1:
@@ -408,4 +464,37 @@ with tab4:
                     st.success("Added!")
 
                 bd_df = AppLogic.get_breakdown_data(costs, view_mode, total_label, mult, total_subs)
-                st.bar_chart(bd_df.set_index("Cost Component"))
\ No newline at end of file
+                st.bar_chart(bd_df.set_index("Cost Component"))
+
+                with st.expander("📊 Uncertainty Range (Monte Carlo)"):
+                    st.caption("Gas and electricity prices, yearly mileage and resale value sampled thousands of times around your inputs.")
+                    if st.button("Run Simulation"):
+                        with st.spinner("Simulating via API..."):
+                            dist = api_client.calculate_distribution(car_row_calc, user_inputs)
+                        if not dist:
+                            st.error("Uncertainty calculation failed via API")
+                        else:
+                            horizon = dist['horizon_months']
+                            band_rows = []
+                            for label, key, subs in [("Monthly True Cost", 'Monthly True Cost', total_subs), ("Monthly Cash Flow", 'Monthly Cash Flow', total_subs), (f"Total True Cost ({horizon:g} Mos)", 'Total Cost', total_subs * horizon)]:
+                                band = dist[key]
+                                band_rows.append({'Estimate': label, 'Optimistic (p10)': f"${band['p10'] + subs:,.0f}", 'Typical (p50)': f"${band['p50'] + subs:,.0f}", 'Pessimistic (p90)': f"${band['p90'] + subs:,.0f}"})
+                            st.dataframe(pd.DataFrame(band_rows).set_index('Estimate'))
+
+                with st.expander("🧭 Deal Optimizer"):
+                    st.caption("Searches cash, every loan term and down payment, and lease terms with money due at signing, then keeps the deals nothing else beats on both monthly cash flow and total true cost.")
+                    default_upfront = kwargs.get('down_payment', kwargs.get('lease_due', price_input))
+                    max_upfront = st.number_input("Cash Available Upfront ($)", min_value=0, value=int(default_upfront), step=500)
+                    if st.button("Find Best Deals"):
+                        with st.spinner("Searching deal terms via API..."):
+                            opt = api_client.optimize_deal(car_row_calc, user_inputs, max_upfront)
+                        if not opt:
+                            st.error("Optimization failed via API")
+                        else:
+                            frontier_df = pd.DataFrame(opt['frontier'])
+                            frontier_df[['Monthly Cash Flow', 'Monthly Outlay']] += total_subs
+                            frontier_df['Total True Cost'] += total_subs * opt['horizon_months']
+                            st.caption(f"{opt['evaluated']:,} deals evaluated, {len(frontier_df)} on the frontier (true cost over {opt['horizon_months']:g} months; outlay spreads the upfront cash over them).")
+                            fig = px.scatter(frontier_df, x='Monthly Outlay', y='Total True Cost', color='method', hover_data=[c for c in ['upfront', 'term', 'lease_term'] if c in frontier_df.columns])
+                            st.plotly_chart(fig, use_container_width=True)
+                            st.dataframe(frontier_df.drop(columns=['Monthly True Cost']).astype(str))
\ No newline at end of file
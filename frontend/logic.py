@@ -1,18 +1,39 @@
+import os
+import sys
+import time
+import json
+import math
+import queue
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import pandas as pd
 import requests
-import json
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+try:
+    from feature_index import FeatureIndex
+except ImportError:
+    # running from a checkout instead of the container, where the Dockerfile copies it in
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'backend'))
+    from feature_index import FeatureIndex
+
 
+# columns the UI lists need up front; full rows are fetched with APIClient.get_cars when a car is picked
+LISTING_FIELDS = ['make', 'model', 'year', 'class', 'price']
 
-def load_data(api_url):
+def load_data(api_url, fields=LISTING_FIELDS):
     """
     Loads basic vehicle data to populate UI lists (Make, Model, etc.).
     Now fetches cleanly from the Backend API instead of a direct DB connection.
     """
-    print("DEBUG (load_data): Requesting full vehicle database from Backend API...")
+    print("DEBUG (load_data): Requesting vehicle listing from Backend API...")
 
     if api_url:
         client = APIClient(api_url)
-        df = client.get_all_cars()
+        df = client.get_all_cars(fields=fields)
         if not df.empty:
             print(f"✅ Successfully loaded {len(df)} cars via API.")
             return df
@@ -29,14 +50,218 @@ def load_data(api_url):
     return pd.DataFrame(fallback_data)
 
 
+def decode_cars(payload):
+    """
+    Builds a typed DataFrame from a get_all_cars response, either the columnar format or plain records.
+    """
+    if not isinstance(payload, dict) or payload.get('format') != 'columnar':
+        return pd.DataFrame(payload)
+
+    df = pd.DataFrame(payload['data'], columns=payload['columns'])
+    for col, dtype in payload.get('dtypes', {}).items():
+        if col not in df.columns:
+            continue
+        if dtype.startswith(('int', 'float', 'uint')):
+            values = pd.to_numeric(df[col])
+            # ints with gaps stay float, same as pandas would read them
+            df[col] = values.astype(dtype) if not values.isna().any() else values
+        elif dtype == 'bool' and not df[col].isna().any():
+            df[col] = df[col].astype(bool)
+    return df
+
+
 # api
+class RequestCache:
+    """
+    Bounded TTL cache of API responses keyed by payload hash, shared by every Streamlit session in the process.
+    Identical requests already in flight are coalesced: one HTTP call, every caller gets its result.
+    Responses are kept as JSON text so callers can't mutate each other's copies.
+    """
+    def __init__(self, ttl=300, max_entries=256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    @staticmethod
+    def key(payload):
+        return hashlib.sha256(json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str).encode('utf-8')).hexdigest()
+
+    def fetch(self, key, loader):
+        """
+        Returns (status_code, text) for key, calling loader() at most once across concurrent callers.
+        Only 200 responses are cached.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and time.monotonic() - entry[0] < self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return 200, entry[1]
+            pending = self._inflight.get(key)
+            owner = pending is None
+            if owner:
+                self.misses += 1
+                pending = self._inflight[key] = {'done': threading.Event()}
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            pending['done'].wait()
+            if 'error' in pending:
+                raise pending['error']
+            return pending['result']
+
+        try:
+            pending['result'] = loader()
+            if pending['result'][0] == 200:
+                with self._lock:
+                    self._entries[key] = (time.monotonic(), pending['result'][1])
+                    self._entries.move_to_end(key)
+                    while len(self._entries) > self.max_entries:
+                        self._entries.popitem(last=False)
+            return pending['result']
+        except Exception as e:
+            pending['error'] = e
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            pending['done'].set()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'coalesced': self.coalesced,
+                'hit_rate': round((self.hits + self.coalesced) / lookups, 3) if lookups else 0.0,
+                'entries': len(self._entries),
+                'in_flight': len(self._inflight),
+                'ttl_s': self.ttl,
+                'max_entries': self.max_entries
+            }
+
 class APIClient:
     """
     Handles all communication with the Backend Lambda.
     Removes the need for local ML libraries.
+    Repeat requests are answered from a RequestCache (pass one to share it, or cache=False to disable).
     """
-    def __init__(self, api_url):
+    # throttled or rejected before the Lambda ran: worth a couple of quick retries
+    RETRY_STATUSES = (429, 502, 503)
+    # pure reads the Lambda answers the same way every time; pitch (Bedrock, billed per call) and refresh are never repeated
+    RETRY_ACTIONS = frozenset(['calculate', 'calculate_batch', 'calculate_distribution', 'sweep', 'optimize_deal', 'recommend', 'get_all_cars'])
+    # longest single wait between retries, whatever Retry-After asks for; the UI is blocked while we sleep
+    MAX_RETRY_DELAY = 5.0
+
+    def __init__(self, api_url, cache=True, connect_timeout=3.05, read_timeout=None, retries=2, backoff=0.3, pool_size=10, max_concurrency=4):
         self.api_url = api_url
+        self.cache = RequestCache() if cache is True else (cache or None)
+        self.connect_timeout = connect_timeout
+        # None keeps each call's own read timeout (15s refresh, 29s for the rest: API Gateway's limit)
+        self.read_timeout = read_timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.session = self._build_session(retries, max(pool_size, max_concurrency))
+        # caps how many calls this client has on the wire at once, across every session sharing it
+        self._executor = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix='api')
+
+    def submit(self, method, *args, **kwargs):
+        """
+        Starts an APIClient call in the background and returns its Future,
+        so independent calls (e.g. costs and the AI pitch) share one round trip of wall-clock time.
+        """
+        return self._executor.submit(method, *args, **kwargs)
+
+    def prefetch_stream(self, chunks):
+        """
+        Starts draining a generator (e.g. stream_ai_pitch) on the worker pool right away and
+        returns a generator over the chunks received so far and to come, for st.write_stream later.
+        """
+        received = queue.Queue()
+        done = object()
+
+        def drain():
+            try:
+                for chunk in chunks:
+                    received.put(chunk)
+            finally:
+                received.put(done)
+
+        def read():
+            while (chunk := received.get()) is not done:
+                yield chunk
+
+        self._executor.submit(drain)
+        return read()
+
+    def _build_session(self, retries, pool_size):
+        """
+        Keep-alive session so calls reuse the TCP/TLS connection to API Gateway instead of handshaking each time.
+        The adapter only retries failed connects (nothing was sent yet); status retries are per action in _post,
+        and a read timeout is never retried since the Lambda may still be running (and billing Bedrock).
+        """
+        retry = Retry(
+            total=retries,
+            connect=retries,
+            read=0,
+            status=0,
+            other=0,
+            allowed_methods=frozenset(['POST']),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(max_retries=retry, pool_connections=1, pool_maxsize=pool_size)
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def _post(self, payload, timeout, cached=True):
+        """
+        POSTs a payload to the Lambda and returns (status_code, text).
+        RETRY_ACTIONS are retried on RETRY_STATUSES with exponential backoff (or the Retry-After header).
+        """
+        attempts = 1 + (self.retries if payload.get('action') in self.RETRY_ACTIONS else 0)
+
+        def send():
+            for attempt in range(attempts):
+                response = self.session.post(self.api_url, json=payload, timeout=(self.connect_timeout, self.read_timeout or timeout))
+                if response.status_code not in self.RETRY_STATUSES or attempt == attempts - 1:
+                    return response.status_code, response.text
+                time.sleep(self._retry_delay(response, attempt))
+
+        if not cached or self.cache is None:
+            return send()
+        return self.cache.fetch(RequestCache.key(payload), send)
+
+    def _retry_delay(self, response, attempt):
+        """Seconds to wait before the next attempt: Retry-After when it's a usable number of seconds, else exponential backoff, capped at MAX_RETRY_DELAY."""
+        delay = self.backoff * (2 ** attempt)
+        try:
+            retry_after = float(response.headers.get('Retry-After', ''))
+            if math.isfinite(retry_after) and retry_after >= 0:
+                delay = retry_after
+        except (TypeError, ValueError):
+            # missing, or an HTTP date
+            pass
+        return min(delay, self.MAX_RETRY_DELAY)
+
+    def cache_stats(self):
+        return self.cache.stats() if self.cache is not None else {}
+
+    def clear_cache(self):
+        if self.cache is not None:
+            self.cache.clear()
 
     def refresh_database(self):
         """Call Lambda to force a refresh of its internal database cache"""
@@ -44,28 +269,66 @@ class APIClient:
         
         try:
             payload = {"action": "refresh"}
-            response = requests.post(self.api_url, json=payload, timeout=15)
-            return response.status_code == 200
+            status, _ = self._post(payload, timeout=15, cached=False)
+            self.clear_cache()
+            return status == 200
         except Exception as e:
             print(f"API Error (Refresh): {e}")
             return False
 
-    def get_all_cars(self):
-        """Call Lambda to get the full database of cars"""
+    def get_all_cars(self, fields=None, filters=None, page_size=2000):
+        """
+        Call Lambda to get the database of cars, a page at a time.
+        fields limits the columns (e.g. LISTING_FIELDS for the dropdowns), filters takes the same hard filters as recommend.
+        """
         if not self.api_url: return pd.DataFrame()
         
         try:
-            payload = {"action": "get_all_cars"}
-            response = requests.post(self.api_url, json=payload, timeout=29)
-            if response.status_code == 200:
-                return pd.DataFrame(response.json())
-            return pd.DataFrame()
+            pages = []
+            cursor = None
+            while True:
+                # columnar + gzip (requests sends Accept-Encoding: gzip and inflates transparently)
+                payload = {"action": "get_all_cars", "format": "columnar", "limit": page_size}
+                if fields:
+                    payload["fields"] = list(fields)
+                if filters:
+                    payload["filters"] = filters
+                if cursor:
+                    payload["cursor"] = cursor
+                # already held by st.cache_data in the app, no point keeping a second copy
+                status, text = self._post(payload, timeout=29, cached=False)
+                if status != 200:
+                    return pd.DataFrame()
+                page = json.loads(text)
+                pages.append(decode_cars(page['cars']))
+                cursor = page.get('next_cursor')
+                if not cursor:
+                    break
+            return pd.concat(pages, ignore_index=True) if len(pages) > 1 else pages[0]
         except Exception as e:
             print(f"API Error (Get All Cars): {e}")
             return pd.DataFrame()
 
-    def get_recommendations(self, user_prefs):
-        """Call Lambda to get ML Recommendations"""
+    def get_cars(self, cars):
+        """Full rows (specs and detail text) for specific cars, given rows/dicts with make, model and year."""
+        if not self.api_url or not cars: return pd.DataFrame()
+        
+        try:
+            keys = [{'make': car['make'], 'model': car['model'], 'year': int(car['year'])} for car in cars]
+            payload = {"action": "get_all_cars", "format": "columnar", "keys": keys}
+            status, text = self._post(payload, timeout=29)
+            if status == 200:
+                return decode_cars(json.loads(text))
+            return pd.DataFrame()
+        except Exception as e:
+            print(f"API Error (Get Cars): {e}")
+            return pd.DataFrame()
+
+    def get_recommendations(self, user_prefs, filters=None, tco_inputs=None, rank_by=None, top_k=None):
+        """
+        Call Lambda to get ML Recommendations.
+        With rank_by='true_cost' the Lambda prices every filtered candidate and returns the top_k cheapest with costs attached.
+        """
         if not self.api_url: return pd.DataFrame()
         
         try:
@@ -73,9 +336,17 @@ class APIClient:
                 "action": "recommend",
                 "inputs": user_prefs
             }
-            response = requests.post(self.api_url, json=payload, timeout=29)
-            if response.status_code == 200:
-                return pd.DataFrame(response.json())
+            if filters: payload['filters'] = filters
+            if tco_inputs: payload['tco_inputs'] = tco_inputs
+            if rank_by: payload['rank_by'] = rank_by
+            if top_k: payload['top_k'] = top_k
+            
+            status, text = self._post(payload, timeout=29)
+            if status == 200:
+                recs_df = pd.DataFrame(json.loads(text))
+                if rank_by == 'true_cost' and not recs_df.empty:
+                    recs_df['source'] = "⚡ AWS Lambda"
+                return recs_df
             return pd.DataFrame()
         except Exception as e:
             print(f"API Error (Recommend): {e}")
@@ -96,19 +367,117 @@ class APIClient:
                 "inputs": inputs
             }
             
-            response = requests.post(self.api_url, json=payload, timeout=29)
+            status, text = self._post(payload, timeout=29)
             
-            if response.status_code == 200:
-                result = response.json()
+            if status == 200:
+                result = json.loads(text)
                 result['source'] = "⚡ AWS Lambda"
                 return result
             else:
-                print(f"DEBUG (calculate_tco): API Error Response Text = {response.text}")
+                print(f"DEBUG (calculate_tco): API Error Response Text = {text}")
             return {}
         except Exception as e:
             print(f"API Error (Calculate): {e}")
             return {}
 
+    def calculate_distribution(self, car_row, inputs, samples=5000):
+        """Call Lambda for Monte Carlo p10/p50/p90 bands (gas, electricity, mileage and resale uncertainty)"""
+        if not self.api_url: return {}
+        
+        try:
+            payload = {
+                "action": "calculate_distribution",
+                "car_data": json.loads(car_row.to_json()),
+                "inputs": inputs,
+                "samples": samples
+            }
+            status, text = self._post(payload, timeout=29)
+            if status == 200:
+                return json.loads(text)
+            print(f"DEBUG (calculate_distribution): API Error Response Text = {text}")
+            return {}
+        except Exception as e:
+            print(f"API Error (Distribution): {e}")
+            return {}
+
+    def sweep(self, car_rows, inputs, axes, metric="Monthly True Cost"):
+        """
+        Call Lambda once for a cost surface over one or two input axes
+        (e.g. [{"name": "gas_price", "start": 2, "stop": 7, "steps": 51}]) plus the break-even points between cars
+        """
+        if not self.api_url: return {}
+        
+        try:
+            payload = {
+                "action": "sweep",
+                "cars": [json.loads(pd.Series(row).to_json()) for row in car_rows],
+                "inputs": inputs,
+                "axes": axes,
+                "metric": metric
+            }
+            status, text = self._post(payload, timeout=29)
+            if status == 200:
+                return json.loads(text)
+            print(f"DEBUG (sweep): API Error Response Text = {text}")
+            return {}
+        except Exception as e:
+            print(f"API Error (Sweep): {e}")
+            return {}
+
+    def optimize_deal(self, car_row, inputs, max_upfront=None):
+        """Call Lambda to search Cash/Finance/Lease terms and return the Pareto frontier (monthly cash flow vs total true cost)"""
+        if not self.api_url: return {}
+        
+        try:
+            payload = {
+                "action": "optimize_deal",
+                "car_data": json.loads(car_row.to_json()),
+                "inputs": inputs,
+                "max_upfront": max_upfront
+            }
+            status, text = self._post(payload, timeout=29)
+            if status == 200:
+                return json.loads(text)
+            print(f"DEBUG (optimize_deal): API Error Response Text = {text}")
+            return {}
+        except Exception as e:
+            print(f"API Error (Optimize Deal): {e}")
+            return {}
+
+    def calculate_tco_batch(self, car_rows, inputs_list, include_curve=False):
+        """
+        Call Lambda once to calculate TCO for every car x inputs variant.
+        include_curve adds each result's month-by-month cost curve under 'curve'.
+        """
+        if not self.api_url: 
+            print("DEBUG: calculate_tco_batch failed - api_url is empty")
+            return []
+        
+        try:
+            cars_clean = [json.loads(pd.Series(row).to_json()) for row in car_rows]
+            payload = {
+                "action": "calculate_batch",
+                "cars": cars_clean,
+                "inputs_list": inputs_list
+            }
+            if include_curve:
+                payload["include_curve"] = True
+            
+            status, text = self._post(payload, timeout=29)
+            
+            if status == 200:
+                grid = json.loads(text).get('results', [])
+                for car_results in grid:
+                    for result in car_results:
+                        result['source'] = "⚡ AWS Lambda"
+                return grid
+            else:
+                print(f"DEBUG (calculate_tco_batch): API Error Response Text = {text}")
+            return []
+        except Exception as e:
+            print(f"API Error (Calculate Batch): {e}")
+            return []
+
     def get_ai_pitch(self, car_row, priority):
         """Call Lambda to get Bedrock AI Pitch"""
         if not self.api_url: return "API Not Configured"
@@ -120,14 +489,43 @@ class APIClient:
                 "car_data": car_data_clean,
                 "inputs": {"priority": priority}
             }
-            response = requests.post(self.api_url, json=payload, timeout=29)
-            if response.status_code == 200:
-                return response.json().get('pitch', "No pitch available.")
-            return f"Error: {response.text}"
+            status, text = self._post(payload, timeout=29)
+            if status == 200:
+                return json.loads(text).get('pitch', "No pitch available.")
+            return f"Error: {text}"
         except Exception as e:
             return f"Connection Error: {str(e)}"
 
 
+    def stream_ai_pitch(self, car_row, priority):
+        """
+        Generator over the Bedrock pitch as it is written (for st.write_stream).
+        Reads the pitch_stream action's NDJSON line by line, so text shows as soon as the backend flushes it.
+        """
+        if not self.api_url:
+            yield "API Not Configured"
+            return
+        
+        try:
+            car_data_clean = json.loads(car_row.to_json())
+            payload = {
+                "action": "pitch_stream",
+                "car_data": car_data_clean,
+                "inputs": {"priority": priority}
+            }
+            with self.session.post(self.api_url, json=payload, stream=True, timeout=(self.connect_timeout, self.read_timeout or 29)) as response:
+                if response.status_code != 200:
+                    yield f"Error: {response.text}"
+                    return
+                for line in response.iter_lines(decode_unicode=True):
+                    if not line:
+                        continue
+                    message = json.loads(line)
+                    if 'delta' in message:
+                        yield message['delta']
+        except Exception as e:
+            yield f"Connection Error: {str(e)}"
+
 # buisness logic
 class AppLogic:
     """
@@ -175,59 +573,54 @@ class AppLogic:
             'rear_legroom': target_legroom, 'acceleration': target_accel,
             'cargo_space': target_cargo_final, 'driver_assist_score': target_assist,
             'offroad_capability': target_offroad,
-            'seats': seats_needs
+            'seats': seats_needs,
+            'priority': priority
         }
 
     @staticmethod
-    def filter_and_process_results(recs_df, fuel_choices, calc_budget, target_class, desired_features, api_client, tco_inputs, total_subs, priority):
-        recs_df = recs_df[recs_df['fuel_type'].isin(fuel_choices)]
-        recs_df = recs_df[recs_df['price'] <= calc_budget]
-        
-        if target_class != "Any":
-            recs_df = recs_df[recs_df['class'] == target_class]
-        
-        if desired_features:
-            feature_aliases = {
-                "Apple CarPlay": ["carplay", "apple carplay", "apple"],
-                "Android Auto": ["android auto", "android"],
-                "Leather": ["leather", "nappa", "vernasca", "startex"],
-                "Sunroof": ["sunroof", "moonroof", "panoramic", "solar roof", "glass roof"],
-                "AWD": ["awd", "4wd", "all-wheel", "four-wheel", "quattro", "xdrive", "4motion"],
-                "Heated Seats": ["heated", "climate package"],
-                "Autopilot": ["autopilot", "bluecruise", "super cruise", "highway driving", "hands-free", "traffic jam", "driving assistant"],
-                "3rd Row": ["3rd row", "third row"],
-                "Tow Package": ["tow", "towing", "trailer", "hitch"]
-            }
-            
-            def car_has_all_features(row):
-                car_dump = str(row.to_dict()).lower()
-                for req_feature in desired_features:
-                    aliases = feature_aliases.get(req_feature, [req_feature.lower()])
-                    if req_feature == "3rd Row" and row.get('seats', 5) >= 7:
-                        continue
-                    if not any(alias.lower() in car_dump for alias in aliases):
-                        return False
-                return True
-                
-            recs_df = recs_df[recs_df.apply(car_has_all_features, axis=1)]
-        
+    def build_hard_filters(fuel_choices, calc_budget, target_class, desired_features, seats_needs):
+        return {
+            'fuel_types': fuel_choices,
+            'max_price': calc_budget,
+            'class': target_class,
+            'features': desired_features,
+            'min_seats': seats_needs
+        }
+
+    @staticmethod
+    def filter_and_process_results(recs_df, calc_budget, desired_features, api_client, tco_inputs, total_subs, feature_index=None):
+        # fuel type, budget, class, seats and must-haves are already applied by the Lambda before the neighbor search,
+        # and the rows come back in priority order (weighted distance, or true cost for "Lowest Total Cost")
         if recs_df.empty:
             return pd.DataFrame()
+        
+        if feature_index is None:
+            feature_index = FeatureIndex.from_frame(recs_df)
             
         recs_df = recs_df.head(5)
         
+        # rows ranked by true cost on the Lambda already carry their costs
+        already_priced = 'Monthly True Cost' in recs_df.columns
+        
+        # one round trip for every candidate
+        if already_priced:
+            cost_grid = [[{}] for _ in range(len(recs_df))]
+        else:
+            cost_grid = api_client.calculate_tco_batch([row for _, row in recs_df.iterrows()], [tco_inputs])
+            if len(cost_grid) != len(recs_df):
+                cost_grid = [[{}] for _ in range(len(recs_df))]
+        
         results = []
-        for idx, row in recs_df.iterrows():
-            costs = api_client.calculate_tco(row, tco_inputs)
+        for (idx, row), car_costs in zip(recs_df.iterrows(), cost_grid):
+            costs = car_costs[0]
             car_data = row.to_dict()
             
-            if costs:
+            if costs or already_priced:
                 car_data.update(costs)
                 car_data['Monthly Cash Flow'] += total_subs
                 car_data['Monthly True Cost'] += total_subs
             
-            car_features = [f.strip() for f in car_data.get('features', '').split(',')]
-            matches = [f for f in desired_features if any(f.lower() in feat.lower() for feat in car_features)]
+            matches = feature_index.matched_features(car_data, desired_features)
             car_data['match_count'] = len(matches)
             car_data['matched_features'] = ", ".join(matches)
             
@@ -235,23 +628,22 @@ class AppLogic:
             
             results.append(car_data)
         
-        sort_cols = ["match_count", "price_diff", "Monthly True Cost"]
-        sort_asc = [False, True, True]
-        
-        if priority == "Lowest Total Cost":
-            sort_cols = ["match_count", "Monthly True Cost"]
-            sort_asc = [False, True] 
-        elif priority == "Performance (Speed)":
-            sort_cols = ["match_count", "acceleration", "price_diff"]
-            sort_asc = [False, True, True] 
-        elif priority == "Utility (Cargo)":
-            sort_cols = ["match_count", "cargo_space", "price_diff"]
-            sort_asc = [False, False, True] 
-        elif priority == "Tech & Safety":
-            sort_cols = ["match_count", "driver_assist_score", "price_diff"]
-            sort_asc = [False, False, True] 
-        
-        return pd.DataFrame(results).sort_values(by=sort_cols, ascending=sort_asc)
+        return pd.DataFrame(results)
+
+    @staticmethod
+    def fetch_full_rows(listing_rows, api_client):
+        """
+        Swaps slim listing rows (dicts) for the full catalog rows, in the same order.
+        Cars the API can't return (offline fallback data) keep their listing row.
+        """
+        full_df = api_client.get_cars(listing_rows)
+        full = {}
+        for car in full_df.to_dict(orient='records'):
+            full[(car['make'], car['model'], int(car['year']))] = car
+        return [
+            {**row, **full.get((row['make'], row['model'], int(row['year'])), {})}
+            for row in listing_rows
+        ]
 
     @staticmethod
     def format_comparison_dataframe(comp_df):
@@ -267,26 +659,42 @@ class AppLogic:
 
     @staticmethod
     def calculate_comparison_tcos(rows_to_display, global_tco_inputs, api_client, total_subs):
-        tco_rows = []
+        # one batch call with each deal's cost curve; the 1/3/5 yr totals are read off the curve, deduped across cars
+        variant_keys = {}
+        inputs_list = []
+        car_series_list = []
+        car_variants = []
         for sel_row in rows_to_display:
-            row_copy = sel_row.copy()
-            deal_inputs = row_copy.get('deal_inputs', global_tco_inputs)
+            deal_inputs = sel_row.get('deal_inputs', global_tco_inputs)
             
-            clean_row_dict = {k: v for k, v in row_copy.items() if k not in ['deal_inputs', 'is_deal']}
-            car_series = pd.Series(clean_row_dict)
+            clean_row_dict = {k: v for k, v in sel_row.items() if k not in ['deal_inputs', 'is_deal']}
+            car_series_list.append(pd.Series(clean_row_dict))
             
-            base_costs = api_client.calculate_tco(car_series, deal_inputs)
+            key = json.dumps(deal_inputs, sort_keys=True, default=str)
+            if key not in variant_keys:
+                variant_keys[key] = len(inputs_list)
+                inputs_list.append(deal_inputs)
+            car_variants.append(variant_keys[key])
+        
+        cost_grid = api_client.calculate_tco_batch(car_series_list, inputs_list, include_curve=True)
+        if len(cost_grid) != len(rows_to_display):
+            cost_grid = [[{}] * len(inputs_list) for _ in rows_to_display]
+        
+        tco_rows = []
+        for sel_row, position, car_costs in zip(rows_to_display, car_variants, cost_grid):
+            row_copy = sel_row.copy()
+            
+            base_costs = car_costs[position]
             if base_costs:
                 row_copy['Monthly Payment'] = base_costs.get('Monthly Payment', 0)
                 row_copy['Monthly True Cost'] = base_costs.get('Monthly True Cost', 0) + total_subs
                 row_copy['Resale Value'] = base_costs.get('Resale Value', 0)
-                
+            
+            true_cost = base_costs.get('curve', {}).get('true_cost', []) if base_costs else []
             for y in [1, 3, 5]:
-                temp_inputs = deal_inputs.copy()
-                temp_inputs['years'] = y
-                costs = api_client.calculate_tco(car_series, temp_inputs)
-                if costs:
-                    row_copy[f'Total Cost ({y} yr)'] = (costs.get('Monthly True Cost', 0) + total_subs) * 12 * y
+                months = 12 * y
+                if len(true_cost) >= months:
+                    row_copy[f'Total Cost ({y} yr)'] = true_cost[months - 1] + total_subs * months
                 else:
                     row_copy[f'Total Cost ({y} yr)'] = 0
                     
@@ -17,6 +17,7 @@ resource "aws_iam_role_policy" "lambda_policy" {
       {
         Action = [
           "bedrock:InvokeModel",
+          "bedrock:InvokeModelWithResponseStream",
           "bedrock:ListFoundationModels",
           "rds:DescribeDBInstances"
         ]
@@ -30,6 +31,14 @@ resource "aws_iam_role_policy" "lambda_policy" {
         ]
         Effect   = "Allow"
         Resource = "*"
+      },
+      {
+        Action = [
+          "dynamodb:GetItem",
+          "dynamodb:PutItem"
+        ]
+        Effect   = "Allow"
+        Resource = aws_dynamodb_table.pitch_cache.arn
       }
     ]
   })
@@ -85,6 +94,7 @@ resource "aws_iam_policy" "lambda_policy" {
       {
         Action = [
           "bedrock:InvokeModel",
+          "bedrock:InvokeModelWithResponseStream",
           "bedrock:ListFoundationModels",
           "rds:DescribeDBInstances"
         ]
@@ -5,4 +5,13 @@ resource "aws_lambda_function" "backend_logic" {
   image_uri     = "${aws_ecr_repository.lambda_repo.repository_url}:latest"
   timeout       = 30
   memory_size   = 512
-}
\ No newline at end of file
+
+  environment {
+    variables = {
+      # lets the backend fetch the password directly instead of listing every secret
+      DB_SECRET_NAME    = aws_secretsmanager_secret.db_password.name
+      # persistent pitch cache behind the in-memory LRU
+      PITCH_CACHE_TABLE = aws_dynamodb_table.pitch_cache.name
+    }
+  }
+}
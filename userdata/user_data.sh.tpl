@@ -39,6 +39,8 @@ sudo -u ubuntu -i bash <<EOF
   echo "Configuring sparse checkout for 'frontend' directory..."
   git config core.sparseCheckout true
   echo "frontend/" >> .git/info/sparse-checkout
+  # shared with the backend; frontend/Dockerfile copies it into the image
+  echo "backend/feature_index.py" >> .git/info/sparse-checkout
   
   echo "Pulling main branch..."
   # Try 'main', fallback to 'master' if it fails